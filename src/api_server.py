@@ -3,7 +3,7 @@ REST API Server for Cyber Law Chatbot
 Flask-based API for React.js frontend integration
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import os
 import json
@@ -26,6 +26,27 @@ def get_chatbot_service():
         chatbot_service = CyberLawChatbotService()
     return chatbot_service
 
+def save_uploaded_file(file_data):
+    """Write a base64 file from a chat request to a temporary path and return it"""
+    import base64
+    
+    # Decode base64 file data
+    file_content = base64.b64decode(file_data['data'].split(',')[1])  # Remove data:mime;base64, prefix
+    
+    # Create temporary file
+    temp_dir = tempfile.gettempdir()
+    file_name = file_data['name']
+    file_path = os.path.join(temp_dir, f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file_name}")
+    
+    # Save file temporarily
+    with open(file_path, 'wb') as f:
+        f.write(file_content)
+    return file_path
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -56,21 +77,7 @@ def chat():
         file_path = None
         if file_data:
             try:
-                import base64
-                import tempfile
-                import os
-                
-                # Decode base64 file data
-                file_content = base64.b64decode(file_data['data'].split(',')[1])  # Remove data:mime;base64, prefix
-                
-                # Create temporary file
-                temp_dir = tempfile.gettempdir()
-                file_name = file_data['name']
-                file_path = os.path.join(temp_dir, f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file_name}")
-                
-                # Save file temporarily
-                with open(file_path, 'wb') as f:
-                    f.write(file_content)
+                file_path = save_uploaded_file(file_data)
                 
                 # Process query with file
                 response = service.process_query(user_message, file_path)
@@ -108,6 +115,110 @@ def chat():
             "success": False
         }), 500
 
+@app.route('/api/chat/async', methods=['POST'])
+async def chat_async():
+    """
+    Same contract as /api/chat, served by the async pipeline (aprocess_query): translation,
+    embeddings, vector search and generation are multiplexed on the shared background loop.
+    Flask is WSGI, so the HTTP request itself still holds a worker thread until the reply is ready;
+    only the backend I/O stops taking a thread per call. Requires Flask's async extra (flask[async]).
+    """
+    try:
+        data = request.get_json()
+        if not data or 'message' not in data:
+            return jsonify({"error": "Message is required"}), 400
+        
+        user_message = data['message']
+        file_data = data.get('file')
+        
+        service = get_chatbot_service()
+        
+        file_path = None
+        if file_data:
+            try:
+                file_path = save_uploaded_file(file_data)
+            except Exception as file_error:
+                print(f"File processing error: {file_error}")
+        
+        try:
+            result = await service.aprocess_query(user_message, file_path)
+        finally:
+            if file_path:
+                try:
+                    os.remove(file_path)
+                except:
+                    pass
+        
+        # The language comes back with the reply: the last history turn may belong to a concurrent request
+        return jsonify({
+            "response": result["response"],
+            "detected_language": result["detected_language"],
+            "intent": "file_analysis" if file_data else "general_query",
+            "timestamp": datetime.now().isoformat(),
+            "success": True
+        })
+        
+    except Exception as e:
+        print(f"Chat error: {e}")
+        return jsonify({
+            "error": "Failed to process message",
+            "details": str(e),
+            "success": False
+        }), 500
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming chat endpoint (text/event-stream); read it with fetch() since EventSource cannot POST
+    Request: same as /api/chat
+    Events: "metadata" {"sections", "faqs", "officers", "timings", "intent", "cached"} once retrieval is done,
+            "token" {"text"} per generated chunk,
+            "final" {"response", "detected_language", "intent", "complete"} when the answer ends
+            ("complete": false when generation failed partway and the response carries the error)
+    """
+    data = request.get_json()
+    if not data or 'message' not in data:
+        return jsonify({"error": "Message is required"}), 400
+    
+    user_message = data['message']
+    file_data = data.get('file')
+    
+    try:
+        service = get_chatbot_service()
+    except Exception as e:
+        print(f"Chat error: {e}")
+        return jsonify({
+            "error": "Failed to process message",
+            "details": str(e),
+            "success": False
+        }), 500
+    
+    file_path = None
+    if file_data:
+        try:
+            file_path = save_uploaded_file(file_data)
+        except Exception as file_error:
+            print(f"File processing error: {file_error}")
+    
+    def events():
+        try:
+            for event in service.stream_query(user_message, file_path):
+                if event["event"] == "final":
+                    event["data"]["timestamp"] = datetime.now().isoformat()
+                yield sse_event(event["event"], event["data"])
+        finally:
+            if file_path:
+                try:
+                    os.remove(file_path)
+                except:
+                    pass
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route('/api/generate-checklist', methods=['POST', 'OPTIONS'])
 def generate_checklist():
     if request.method == 'OPTIONS':
@@ -319,6 +430,31 @@ def get_conversation_history():
             "success": False
         }), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Retrieval, embedding, translation and semantic response cache statistics
+    Response: {"retrieval": {"hit_rate": 0.4, "memory_bytes": 123456, ...}, "embedding": {...}, "success": true}
+    """
+    try:
+        service = get_chatbot_service()
+        
+        return jsonify({
+            "retrieval": service.searcher.retrieval_cache.stats(),
+            "embedding": service.searcher.embedding_cache.stats(),
+            "translation": service.translator.cache.stats(),
+            "semantic": service.response_cache.stats(),
+            "success": True
+        })
+        
+    except Exception as e:
+        print(f"Cache stats error: {e}")
+        return jsonify({
+            "error": "Failed to get cache statistics",
+            "details": str(e),
+            "success": False
+        }), 500
+
 @app.route('/api/clear', methods=['POST'])
 def clear_session():
     """
@@ -326,8 +462,9 @@ def clear_session():
     Response: {"message": "Session cleared", "success": true}
     """
     try:
-        global chatbot_service
-        chatbot_service = None  # Reset service
+        # Only session state is reset: in-flight requests may still be searching with this service
+        if chatbot_service is not None:
+            chatbot_service.reset_session()
         
         return jsonify({
             "message": "Session cleared successfully",
@@ -352,11 +489,13 @@ def api_documentation():
         "endpoints": {
             "GET /health": "Health check",
             "POST /api/chat": "General chat queries",
+            "POST /api/chat/stream": "General chat queries, streamed as server-sent events",
             "POST /api/complaint/start": "Start complaint collection",
             "POST /api/complaint/answer": "Continue complaint collection",
             "POST /api/file/analyze": "Analyze uploaded files",
             "GET /api/complaint/<id>/download": "Download complaint file",
             "GET /api/history": "Get conversation history",
+            "GET /api/cache/stats": "Retrieval, embedding, translation and semantic response cache statistics",
             "POST /api/clear": "Clear session data"
         },
         "features": [
@@ -0,0 +1,53 @@
+"""
+Background Event Loop
+A single long-lived asyncio loop on a daemon thread. Async Weaviate and Gemini clients are
+bound to the loop they were created on, while Flask runs each async view in a fresh loop,
+so the async pipeline always runs here and request handlers await it from their own loop.
+"""
+
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable
+
+class BackgroundEventLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name="async-runtime", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def submit(self, coroutine: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the background loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+    
+    async def run(self, coroutine: Awaitable[Any]) -> Any:
+        """Await a coroutine on the background loop from another event loop"""
+        if asyncio.get_running_loop() is self.loop:
+            return await coroutine
+        return await asyncio.wrap_future(self.submit(coroutine))
+    
+    def run_sync(self, coroutine: Awaitable[Any]) -> Any:
+        """Block the calling (non-loop) thread until the coroutine finishes"""
+        return self.submit(coroutine).result()
+    
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def get_background_loop() -> BackgroundEventLoop:
+    """Get or start the process-wide background event loop"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundEventLoop()
+            atexit.register(_background_loop.stop)
+        return _background_loop
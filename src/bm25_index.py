@@ -0,0 +1,117 @@
+"""
+Local BM25 Index
+In-memory inverted index over the knowledge base text fields, used alongside vector search
+in hybrid retrieval. Exact-term lookups such as "section 66C" or "354D" score highly here
+even when their embeddings are not close to the query's.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple
+from knowledge_base import record_uuid
+
+# Properties indexed per collection
+BM25_FIELDS = {
+    "CyberLaw": ["section_number", "title", "summary", "content"],
+    "FAQ": ["question", "answer"],
+    "NodalOfficer": ["state", "officer_name", "rank"]
+}
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.casefold())
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # collection name -> {"ids", "properties", "lengths", "average_length", "postings": {term: [(doc, tf)]}}
+        self.collections = {}
+    
+    def add_collection(self, name: str, ids: List[str], documents: List[str], properties: List[Dict[str, Any]]):
+        postings = {}
+        lengths = []
+        for doc_index, document in enumerate(documents):
+            tokens = tokenize(document)
+            lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_index, frequency))
+        
+        self.collections[name] = {
+            "ids": ids,
+            "properties": properties,
+            "lengths": lengths,
+            "average_length": (sum(lengths) / len(lengths)) if lengths else 0.0,
+            "postings": postings
+        }
+    
+    def search(self, name: str, query: str, limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Top `limit` (id, properties, score) for a query, best first; only documents sharing a term"""
+        collection = self.collections.get(name)
+        if not collection or not collection["ids"]:
+            return []
+        
+        document_count = len(collection["ids"])
+        average_length = collection["average_length"] or 1.0
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = collection["postings"].get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_index, frequency in postings:
+                length_norm = 1 - self.b + self.b * collection["lengths"][doc_index] / average_length
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(collection["ids"][doc_index], collection["properties"][doc_index], score) for doc_index, score in ranked]
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"documents": len(collection["ids"]), "terms": len(collection["postings"])}
+            for name, collection in self.collections.items()
+        }
+    
+    @classmethod
+    def from_objects(cls, objects_by_collection: Dict[str, Tuple[List[str], Sequence[Dict[str, Any]]]]) -> "BM25Index":
+        """Index (ids, properties) per collection, e.g. the objects a LocalVectorIndex searches"""
+        index = cls()
+        for name, (ids, properties) in objects_by_collection.items():
+            start = time.perf_counter()
+            fields = BM25_FIELDS.get(name, [])
+            properties = list(properties)
+            index.add_collection(
+                name,
+                list(ids),
+                [" ".join(str(item.get(field, '')) for field in fields) for item in properties],
+                properties
+            )
+            print(f"BM25 indexed {len(properties)} {name} objects in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+    
+    @classmethod
+    def from_records(cls, records_by_collection: Dict[str, List[Dict[str, Any]]]) -> "BM25Index":
+        """Index knowledge base records; ids match the deterministic uuids used at ingestion"""
+        return cls.from_objects({
+            name: ([record_uuid(name, record["key"]) for record in records], [record["properties"] for record in records])
+            for name, records in records_by_collection.items()
+        })
+    
+    @classmethod
+    def from_weaviate(cls, client, collection_names: Dict[str, str], return_properties: Dict[str, List[str]] = None) -> "BM25Index":
+        """
+        Index the objects stored in Weaviate under their own uuids; collection_names maps logical to physical
+        names, return_properties lists the properties kept for BM25-only results besides the indexed fields
+        """
+        objects = {}
+        for name, physical_name in collection_names.items():
+            fields = list(dict.fromkeys(BM25_FIELDS.get(name, []) + (return_properties or {}).get(name, [])))
+            ids, properties = [], []
+            for item in client.collections.get(physical_name).iterator(return_properties=fields):
+                ids.append(str(item.uuid))
+                properties.append(dict(item.properties))
+            objects[name] = (ids, properties)
+        return cls.from_objects(objects)
@@ -1,16 +1,81 @@
+import asyncio
+import hashlib
+import json
 import os
+import re
 import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
+from async_runtime import get_background_loop
 from gemini_translator import GeminiTranslationModule
+from language_detector import detect_language
 from vector_searcher import VectorSearcher
 from act_categorizer import ActCategorizer
+from context_builder import ContextBuilder
 from complaint_collector import ComplaintCollector
 from file_processor import FileProcessor
-from typing import Dict, List, Any
+from result_merger import ResultMerger
+from semantic_cache import SemanticResponseCache
+from typing import Dict, List, Any, Iterator
 
 load_dotenv()
 
+# Extra searches added to a legal query when it mentions any of the trigger terms
+QUERY_EXPANSIONS = [
+    (["access", "unauthorized", "database", "system"],
+     ["unauthorized access", "section 43", "section 66", "computer trespass"]),
+    (["punishment", "penalty", "jail", "fine"],
+     ["punishment", "penalty", "imprisonment", "fine"]),
+    (["ipc", "indian penal code", "bns", "bharatiya nyaya sanhita"],
+     ["IPC", "Indian Penal Code", "BNS", "Bharatiya Nyaya Sanhita", "traditional criminal law"])
+]
+
+# Rank-fusion weight of each expansion search relative to the user's own query
+EXPANSION_WEIGHT = 0.5
+
+RATE_LIMIT_MESSAGE = "I'm getting a lot of questions right now! Please try again in about a minute. I'll be ready to help you with your cyber law questions soon! 😊"
+EMPTY_RESPONSE_MESSAGE = "I apologize, but I'm having trouble generating a response right now. Please try again."
+GENERATION_ERROR_MESSAGE = "I apologize, but I encountered an error while generating the response. Please try again."
+PROCESSING_ERROR_MESSAGE = "I apologize, but I encountered an error while processing your question. Please try again later."
+
+# Replies that must never be served from the semantic response cache
+UNCACHEABLE_RESPONSES = {RATE_LIMIT_MESSAGE, EMPTY_RESPONSE_MESSAGE, GENERATION_ERROR_MESSAGE}
+
+# QUERY_PIPELINE: "translate" (non-English queries are translated before retrieval) or "direct" (the
+# original text is embedded with a multilingual model and the answer prompt handles the language,
+# saving the translation call; needs a MULTILINGUAL_EMBEDDING_MODELS index). Section references, state
+# names, QUERY_EXPANSIONS and BM25 only match English/Latin text, so in direct mode a native-script
+# query feeds them just its Latin keywords ("UPI", "66C", "Delhi"); without any, retrieval is vector-only.
+QUERY_PIPELINES = ("translate", "direct")
+
+# Latin words and numbers kept from a native-script query for the lexical steps
+LATIN_KEYWORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+# Section-like numbers ("66C", "420"); queries that differ only in these must not share a cached answer
+SECTION_NUMBER_PATTERN = re.compile(r"\b\d{1,3}[a-z]{0,2}\b")
+
+# Reply languages too vague to match a cached answer on (an unrecognized script or non-English Latin text)
+UNCACHEABLE_LANGUAGES = {"Other"}
+
+# Reply when nothing relevant was found and the no-result prompt also failed
+NO_RESULT_FALLBACK = """**CYBERLEX RESPONSE:**
+
+**SITUATION:** I don't have specific information about that particular topic in my current knowledge base, but I'm here to assist you with cyber law matters.
+
+**KEY POINTS:**
+• I specialize in Indian cyber crime definitions and laws
+• I can guide you through FIR registration procedures
+• I can provide nodal officer contacts for your state
+
+**CYBERLEX RECOMMENDATION:**
+• Please provide more specific details about your query
+• I can help you understand legal procedures and your rights
+
+**NEED MORE HELP?**
+• Would you like to know about specific cyber crime types?
+• Can I help you understand how to report a cyber crime?
+• Do you need contact information for your state's cyber crime cell?"""
+
 class CyberLawChatbotService:
     def __init__(self):
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
@@ -29,24 +94,23 @@ class CyberLawChatbotService:
             self.searcher = VectorSearcher()
             self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
             self.act_categorizer = ActCategorizer()
+            self.context_builder = ContextBuilder(self.act_categorizer)  # CONTEXT_TOKEN_BUDGET
             self.complaint_collector = ComplaintCollector()
             self.file_processor = FileProcessor()
+            self.result_merger = ResultMerger()  # RESULT_MERGE_STRATEGY: rrf (default) or min_distance
+            self.response_cache = SemanticResponseCache()  # SEMANTIC_CACHE_THRESHOLD / SEMANTIC_CACHE_SIZE
+            self.query_pipeline = self.resolve_query_pipeline()
+            
+            # Pre-warm the embedding cache so expansion terms never cost an API call
+            self.searcher.warm_embedding_cache([term for _, terms in QUERY_EXPANSIONS for term in terms])
             print("Enhanced chatbot service initialized successfully!")
         except Exception as e:
             print(f"Error initializing chatbot service: {e}")
             raise
     
-    def generate_response(self, user_query: str, search_results: Dict[str, List[Dict[str, Any]]], original_language: str = "English", user_input: str = "") -> str:
-        """Generate response using Gemini with context from search results"""
-        try:
-            # Check if we have any meaningful results
-            total_results = (len(search_results.get('cyberlaw', [])) + 
-                           len(search_results.get('faq', [])) + 
-                           len(search_results.get('nodal_officers', [])))
-            
-            if total_results == 0:
-                # Generate comprehensive no-result message
-                no_result_prompt = f"""
+    def build_no_result_prompt(self, user_query: str, original_language: str = "English") -> str:
+        """Prompt for questions the knowledge base has nothing on"""
+        return f"""
 You are Cyberlex, a professional cyber law assistant. The user asked about something not in your current knowledge base.
 
 Provide a comprehensive response in {original_language if original_language != 'English' else 'English'} using this format:
@@ -83,86 +147,24 @@ Provide a comprehensive response in {original_language if original_language != '
 USER QUESTION: {user_query}
 
 Maintain a professional, comprehensive, and helpful tone."""
-
-                try:
-                    no_result_response = self.model.generate_content(no_result_prompt)
-                    if no_result_response and no_result_response.text:
-                        return no_result_response.text.strip()
-                except:
-                    pass
-                    
-                # Fallback message in English
-                return """**CYBERLEX RESPONSE:**
-
-**SITUATION:** I don't have specific information about that particular topic in my current knowledge base, but I'm here to assist you with cyber law matters.
-
-**KEY POINTS:**
-• I specialize in Indian cyber crime definitions and laws
-• I can guide you through FIR registration procedures
-• I can provide nodal officer contacts for your state
-
-**CYBERLEX RECOMMENDATION:**
-• Please provide more specific details about your query
-• I can help you understand legal procedures and your rights
-
-**NEED MORE HELP?**
-• Would you like to know about specific cyber crime types?
-• Can I help you understand how to report a cyber crime?
-• Do you need contact information for your state's cyber crime cell?"""
-            
-            # Prepare context from search results
-            context_parts = []
-            
-            # Add CyberLaw context with color coding
-            if search_results.get('cyberlaw'):
-                context_parts.append("=== RELEVANT CYBER LAW SECTIONS ===")
-                for result in search_results['cyberlaw']:
-                    # Get color-coded section info
-                    colored_section = self.act_categorizer.format_colored_section(
-                        result['section_number'], 
-                        result['title'], 
-                        result['law_type'],
-                        result.get('summary', '') + ' ' + result.get('content', '')
-                    )
-                    context_parts.append(colored_section)
-                    context_parts.append(f"Summary: {result['summary']}")
-                    context_parts.append(f"Content: {result['content']}")
-                    context_parts.append("")
-            
-            # Add FAQ context
-            if search_results.get('faq'):
-                context_parts.append("=== RELEVANT FAQs ===")
-                for result in search_results['faq']:
-                    context_parts.append(f"Q: {result['question']}")
-                    context_parts.append(f"A: {result['answer']}")
-                    context_parts.append("")
-            
-            # Add Nodal Officers context if relevant
-            if search_results.get('nodal_officers'):
-                context_parts.append("=== RELEVANT CONTACT INFORMATION ===")
-                for result in search_results['nodal_officers']:
-                    context_parts.append(f"State: {result['state']}")
-                    context_parts.append(f"Nodal Officer: {result['officer_name']} ({result['rank']})")
-                    context_parts.append(f"Email: {result['email']}")
-                    if result['contact']:
-                        context_parts.append(f"Contact: {result['contact']}")
-                    context_parts.append("")
-            
-            context = "\n".join(context_parts)
-            
-            # Add conversation history to context
-            history_context = ""
-            if self.conversation_history:
-                history_context = "\n=== RECENT CONVERSATION (for reference) ===\n"
-                # Show last few turns (most recent first)
-                for i, turn in enumerate(reversed(self.conversation_history[-self.max_history_turns:])):
-                    history_context += f"Turn {len(self.conversation_history)-i}: User asked: {turn['user_original']}\n"
-                    history_context += f"Bot replied: {turn['bot_reply'][:100]}...\n\n"
-            
-            # Create prompt for enhanced response generation
-            language_instruction = f"Respond in {original_language}" if original_language != "English" else "Respond in English"
-            
-            prompt = f"""
+    
+    def build_response_prompt(self, user_query: str, search_results: Dict[str, List[Dict[str, Any]]], original_language: str = "English", user_input: str = "") -> str:
+        """Prompt with the color-coded legal context, FAQs, contacts and recent conversation, within CONTEXT_TOKEN_BUDGET"""
+        built = self.context_builder.build(search_results, self.conversation_history, self.max_history_turns)
+        context, history_context = built["context"], built["history"]
+        tokens = built["tokens"]
+        dropped = ", ".join(f"{count} {source}" for source, count in built["dropped"].items() if count)
+        print(f"Context: {tokens['total']}/{tokens['budget']} tokens "
+              f"(cyberlaw {tokens['cyberlaw']}, faq {tokens['faq']}, contacts {tokens['nodal_officers']}, history {tokens['history']})"
+              + (f", dropped {dropped}" if dropped else ""))
+        
+        # Create prompt for enhanced response generation
+        language_instruction = f"Respond in {original_language}" if original_language != "English" else "Respond in English"
+        if original_language != "English" and user_query == user_input:
+            # Direct pipeline: the question was never translated
+            language_instruction += f". The user question is in {original_language} and the context is in English; understand the question as written"
+        
+        return f"""
 You are Cyberlex, a professional cyber law assistant. Provide comprehensive, detailed responses about Indian cyber law with complete legal analysis. You MUST be thorough and responsible in your guidance.
 
 {history_context}
@@ -257,23 +259,108 @@ CRITICAL REQUIREMENTS:
 - {language_instruction}. Match the user's original language exactly.
 
 RESPONSE:"""
-
+    
+    @staticmethod
+    def count_results(search_results: Dict[str, List[Dict[str, Any]]]) -> int:
+        return (len(search_results.get('cyberlaw', [])) + 
+                len(search_results.get('faq', [])) + 
+                len(search_results.get('nodal_officers', [])))
+    
+    @staticmethod
+    def generation_error_message(error: Exception) -> str:
+        """User-facing message for a failed generation call"""
+        error_msg = str(error)
+        
+        # Handle rate limiting gracefully
+        if "429" in error_msg or "quota" in error_msg.lower():
+            return RATE_LIMIT_MESSAGE
+        
+        return GENERATION_ERROR_MESSAGE
+    
+    def generate_response(self, user_query: str, search_results: Dict[str, List[Dict[str, Any]]], original_language: str = "English", user_input: str = "") -> str:
+        """Generate response using Gemini with context from search results"""
+        try:
+            # Check if we have any meaningful results
+            if self.count_results(search_results) == 0:
+                try:
+                    no_result_response = self.model.generate_content(self.build_no_result_prompt(user_query, original_language))
+                    if no_result_response and no_result_response.text:
+                        return no_result_response.text.strip()
+                except:
+                    pass
+                    
+                # Fallback message in English
+                return NO_RESULT_FALLBACK
+            
+            prompt = self.build_response_prompt(user_query, search_results, original_language, user_input)
             response = self.model.generate_content(prompt)
             
             if response and response.text:
                 return response.text.strip()
             else:
-                return "I apologize, but I'm having trouble generating a response right now. Please try again."
+                return EMPTY_RESPONSE_MESSAGE
                 
         except Exception as e:
-            error_msg = str(e)
             print(f"Error generating response: {e}")
+            return self.generation_error_message(e)
+    
+    async def agenerate_response(self, user_query: str, search_results: Dict[str, List[Dict[str, Any]]], original_language: str = "English", user_input: str = "") -> str:
+        """Async variant of generate_response (generate_content_async)"""
+        try:
+            if self.count_results(search_results) == 0:
+                try:
+                    no_result_response = await self.model.generate_content_async(self.build_no_result_prompt(user_query, original_language))
+                    if no_result_response and no_result_response.text:
+                        return no_result_response.text.strip()
+                except Exception:
+                    pass
+                return NO_RESULT_FALLBACK
             
-            # Handle rate limiting gracefully
-            if "429" in error_msg or "quota" in error_msg.lower():
-                return "I'm getting a lot of questions right now! Please try again in about a minute. I'll be ready to help you with your cyber law questions soon! 😊"
+            # Building the prompt can fetch lazy result fields with the sync client
+            prompt = await asyncio.to_thread(self.build_response_prompt, user_query, search_results, original_language, user_input)
+            response = await self.model.generate_content_async(prompt)
             
-            return "I apologize, but I encountered an error while generating the response. Please try again."
+            if response and response.text:
+                return response.text.strip()
+            return EMPTY_RESPONSE_MESSAGE
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return self.generation_error_message(e)
+    
+    def stream_response(self, user_query: str, search_results: Dict[str, List[Dict[str, Any]]], original_language: str = "English",
+                        user_input: str = "", outcome: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        generate_response with Gemini's streaming mode: yields the answer in chunks as they are generated.
+        If generation fails, outcome["failed"] is set to True after the error message has been yielded.
+        """
+        if self.count_results(search_results) == 0:
+            prompt, fallback = self.build_no_result_prompt(user_query, original_language), NO_RESULT_FALLBACK
+        else:
+            prompt, fallback = self.build_response_prompt(user_query, search_results, original_language, user_input), EMPTY_RESPONSE_MESSAGE
+        
+        produced = False
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. the closing chunk carrying only a finish reason)
+                    continue
+                if text:
+                    produced = True
+                    yield text
+        except Exception as e:
+            print(f"Error streaming response: {e}")
+            if outcome is not None:
+                outcome["failed"] = True
+            if fallback == NO_RESULT_FALLBACK and not produced:
+                yield NO_RESULT_FALLBACK
+            else:
+                yield ("\n\n" if produced else "") + self.generation_error_message(e)
+            return
+        
+        if not produced:
+            yield fallback
     
     def add_to_conversation_history(self, user_original: str, user_english: str, bot_reply: str, language: str):
         """Add conversation turn to history with rolling window"""
@@ -532,6 +619,131 @@ Keep the response natural and conversational, without forcing legal topics.
         query_lower = query.lower()
         return any(keyword in query_lower for keyword in legal_keywords)
 
+    def expansion_queries(self, english_query: str, search_results: Dict[str, Any]) -> List[str]:
+        """Extra searches based on query content, unless the query named its sections outright"""
+        exact_matches = sum(1 for result in search_results.get('cyberlaw', []) if result.get('exact_match'))
+        if exact_matches:
+            print(f"Resolved {exact_matches} named sections directly, skipping query expansions")
+            return []
+        
+        additional_searches = []
+        query_lower = english_query.lower()
+        for triggers, terms in QUERY_EXPANSIONS:
+            if any(term in query_lower for term in triggers):
+                additional_searches.extend(terms)
+        return additional_searches
+    
+    def expansion_limits(self, search_results: Dict[str, Any]) -> Dict[str, int]:
+        """Per-category limits for expansion searches; NodalOfficer is skipped when the directory found the user's state"""
+        limits = dict(self.searcher.default_limits)
+        if any(result.get('exact_match') for result in search_results.get('nodal_officers', [])):
+            limits.pop('nodal_officers', None)
+        return limits
+    
+    def merge_expansions(self, search_results: Dict[str, Any], batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Fuse expansion results with the main results, keeping the top-k per category so the context stays small and ranked"""
+        timings = search_results.get('timings', {})
+        timings['expansions'] = batch['timings'].get('total', 0.0)
+        
+        weights = [1.0] + [EXPANSION_WEIGHT] * len(batch['result_sets'])
+        merged = self.result_merger.merge(
+            [search_results] + batch['result_sets'], self.searcher.default_limits, weights
+        )
+        merged['timings'] = timings
+        # Expansion results are held to the same cutoffs as the main query's
+        return self.searcher.apply_policy(merged, "chat")
+    
+    @staticmethod
+    def log_search_results(search_results: Dict[str, Any]):
+        cyberlaw_count = len(search_results.get('cyberlaw', []))
+        faq_count = len(search_results.get('faq', []))
+        officer_count = len(search_results.get('nodal_officers', []))
+        print(f"Comprehensive search found: {cyberlaw_count} law sections, {faq_count} FAQs, {officer_count} officers")
+    
+    def resolve_query_pipeline(self) -> str:
+        """QUERY_PIPELINE, falling back to translate when the embedding model is English-only"""
+        pipeline = os.getenv('QUERY_PIPELINE', 'translate').lower()
+        if pipeline not in QUERY_PIPELINES:
+            print(f"Unknown QUERY_PIPELINE '{pipeline}', using translate")
+            return "translate"
+        if pipeline == "direct" and not self.searcher.multilingual_embeddings:
+            print(f"QUERY_PIPELINE=direct needs a multilingual embedding model ({self.searcher.embedding_model} is not), using translate")
+            return "translate"
+        return pipeline
+    
+    def understand_query(self, user_input: str) -> Dict[str, str]:
+        """{"original_language", "translated_text"}; the direct pipeline searches with the original text"""
+        if self.query_pipeline == "direct":
+            detected = detect_language(user_input)
+            if detected["script"] != "Latin":
+                keywords = self.lexical_query(user_input)
+                print(f"Direct pipeline: {detected['language']} query, section/state matching, expansions and BM25 "
+                      + (f"use only its Latin keywords '{keywords}'" if keywords else "skipped (no Latin keywords), vector search only"))
+            return {"original_language": detected["language"], "translated_text": user_input}
+        return self.translator.detect_language_and_translate(user_input)
+    
+    async def aunderstand_query(self, user_input: str) -> Dict[str, str]:
+        """Async variant of understand_query"""
+        if self.query_pipeline == "direct":
+            return self.understand_query(user_input)
+        return await self.translator.adetect_language_and_translate(user_input)
+    
+    def lexical_query(self, query: str) -> str:
+        """
+        Text for the English-only lexical steps (section references, state names, expansions, BM25), or None
+        to use the query itself. In direct mode a native-script query is reduced to its Latin keywords.
+        """
+        if self.query_pipeline != "direct":
+            return None
+        if detect_language(query)["script"] == "Latin":
+            return None
+        return " ".join(LATIN_KEYWORD_PATTERN.findall(query))
+    
+    def cache_scope(self, english_query: str) -> str:
+        """
+        Exact key for what shapes an answer besides the query's meaning. Section numbers and states barely
+        move the embedding ("66C" vs "66D", Kerala vs Karnataka), and the prompt includes the recent conversation.
+        """
+        lexical_query = self.lexical_query(english_query)
+        if lexical_query is not None:
+            english_query = lexical_query
+        sections = self.searcher.section_resolver.references(english_query)
+        numbers = SECTION_NUMBER_PATTERN.findall(english_query.casefold())
+        states = self.searcher.nodal_directory.locate(english_query)
+        history = [[turn['user_original'], turn['bot_reply']] for turn in self.conversation_history[-self.max_history_turns:]]
+        material = json.dumps([sorted(sections), sorted(set(numbers)), sorted(states), history], ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def cached_response(self, english_query: str, query_vector: List[float], original_language: str) -> str:
+        """Answer to a near-duplicate earlier question in the same language and scope, or None"""
+        if original_language in UNCACHEABLE_LANGUAGES:
+            return None
+        hit = self.response_cache.lookup(query_vector, original_language, self.searcher.corpus_version(), self.cache_scope(english_query))
+        if hit is None:
+            return None
+        print(f"Semantic cache hit ({hit['similarity']:.3f}): {hit['query']}")
+        return hit["response"]
+    
+    def cache_response(self, english_query: str, query_vector: List[float], original_language: str, response: str):
+        if original_language in UNCACHEABLE_LANGUAGES or response in UNCACHEABLE_RESPONSES:
+            return
+        self.response_cache.store(english_query, query_vector, original_language, self.searcher.corpus_version(), response,
+                                  self.cache_scope(english_query))
+    
+    def retrieve(self, english_query: str) -> Dict[str, Any]:
+        """Primary comprehensive search plus the query's expansion searches (run in one batch), merged"""
+        lexical_query = self.lexical_query(english_query)
+        search_results = self.searcher.comprehensive_search(english_query, lexical_query=lexical_query)
+        
+        additional_searches = self.expansion_queries(english_query if lexical_query is None else lexical_query, search_results)
+        if additional_searches:
+            search_results = self.merge_expansions(
+                search_results, self.searcher.batch_search_sets(additional_searches, self.expansion_limits(search_results))
+            )
+        
+        self.log_search_results(search_results)
+        return search_results
+    
     def process_query(self, user_input: str, file_path: str = None) -> str:
         """Main method to process user query through the complete pipeline"""
         try:
@@ -567,57 +779,30 @@ Keep the response natural and conversational, without forcing legal topics.
                 self.add_to_conversation_history(user_input, user_input, response, "English")
                 return response
             
-            # Step 1: Translate to English if needed (simplified)
-            print("Translating to English...")
-            english_query = self.translator.translate_to_english(user_input)
-            original_language = "English" if english_query == user_input else "Other"
+            # Step 1: Detect the language locally and translate to English if needed
+            # (the direct pipeline keeps the original text and answers in its language in one call)
+            translation = self.understand_query(user_input)
+            english_query = translation["translated_text"]
+            original_language = translation["original_language"]
             print(f"Original language: {original_language}")
             print(f"Translated query: {english_query}")
             
+            # Paraphrases of an already answered question skip retrieval and generation
+            # (the embedding is cached, so comprehensive_search reuses it)
+            query_vector = self.searcher.generate_query_embedding(english_query)
+            response = self.cached_response(english_query, query_vector, original_language)
+            if response is not None:
+                self.add_to_conversation_history(user_input, english_query, response, original_language)
+                return response
+            
             # Step 2: Enhanced multi-query search for comprehensive results
             print("Performing comprehensive search...")
-            
-            # Primary search with original query
-            search_results = self.searcher.comprehensive_search(english_query)
-            
-            # Additional targeted searches for comprehensive coverage
-            additional_searches = []
-            
-            # Add specific searches based on query content
-            query_lower = english_query.lower()
-            if any(term in query_lower for term in ["access", "unauthorized", "database", "system"]):
-                additional_searches.extend(["unauthorized access", "section 43", "section 66", "computer trespass"])
-            
-            if any(term in query_lower for term in ["punishment", "penalty", "jail", "fine"]):
-                additional_searches.extend(["punishment", "penalty", "imprisonment", "fine"])
-                
-            if any(term in query_lower for term in ["ipc", "indian penal code", "bns", "bharatiya nyaya sanhita"]):
-                additional_searches.extend(["IPC", "Indian Penal Code", "BNS", "Bharatiya Nyaya Sanhita", "traditional criminal law"])
-            
-            # Perform additional searches and merge results
-            for additional_query in additional_searches:
-                additional_results = self.searcher.comprehensive_search(additional_query)
-                
-                # Merge results while avoiding duplicates
-                for category in ['cyberlaw', 'faq', 'nodal_officers']:
-                    existing_ids = {result.get('section_number', '') + result.get('title', '') + result.get('question', '') 
-                                  for result in search_results.get(category, [])}
-                    
-                    for result in additional_results.get(category, []):
-                        result_id = result.get('section_number', '') + result.get('title', '') + result.get('question', '')
-                        if result_id not in existing_ids:
-                            search_results[category].append(result)
-                            existing_ids.add(result_id)
-            
-            # Log comprehensive search results
-            cyberlaw_count = len(search_results.get('cyberlaw', []))
-            faq_count = len(search_results.get('faq', []))
-            officer_count = len(search_results.get('nodal_officers', []))
-            print(f"Comprehensive search found: {cyberlaw_count} law sections, {faq_count} FAQs, {officer_count} officers")
+            search_results = self.retrieve(english_query)
             
             # Step 3: Generate response using Gemini with context
             print("Generating response...")
             response = self.generate_response(english_query, search_results, original_language, user_input)
+            self.cache_response(english_query, query_vector, original_language, response)
             
             # Step 4: Add to conversation history
             self.add_to_conversation_history(user_input, english_query, response, original_language)
@@ -626,167 +811,114 @@ Keep the response natural and conversational, without forcing legal topics.
             
         except Exception as e:
             print(f"Error processing query: {e}")
-            return "I apologize, but I encountered an error while processing your question. Please try again later."
+            return PROCESSING_ERROR_MESSAGE
     
-    def generate_dynamic_checklist(self, complaint_type: str) -> dict:
-        """Generate a dynamic checklist based on complaint type using AI"""
+    async def aprocess_query(self, user_input: str, file_path: str = None) -> Dict[str, str]:
+        """
+        Async process_query: translation, embeddings, Weaviate queries and generation are awaited on
+        the shared background loop, so slow LLM calls do not each hold an OS thread of their own
+        (the caller's WSGI worker still waits for the result).
+        Greetings, complaints, file analysis and general questions go through process_query in a thread.
+        Returns {"response", "detected_language"}, since conversation_history is shared across requests.
+        """
+        return await get_background_loop().run(self._aprocess_query(user_input, file_path))
+    
+    async def _aprocess_query(self, user_input: str, file_path: str = None) -> Dict[str, str]:
         try:
-            print(f"Generating dynamic checklist for: {complaint_type}")
-            
-            # Enhanced search for relevant checklist information
-            search_results = self.searcher.comprehensive_search(f"complaint checklist {complaint_type} required documents evidence")
+            intent = self.detect_intent(user_input)
+            if (intent in ("greeting", "state_response", "complaint") or (file_path and intent == "file_analysis")
+                    or not self.is_legal_query(user_input)):
+                response = await asyncio.to_thread(self.process_query, user_input, file_path)
+                return {"response": response, "detected_language": "English"}
             
-            # Build context from search results
-            context_parts = []
+            translation = await self.aunderstand_query(user_input)
+            english_query = translation["translated_text"]
+            original_language = translation["original_language"]
             
-            if search_results.get('cyberlaw'):
-                context_parts.append("=== RELEVANT LEGAL REQUIREMENTS ===")
-                for result in search_results['cyberlaw']:
-                    context_parts.append(f"Section {result['section_number']}: {result['title']}")
-                    context_parts.append(f"Content: {result['content']}")
-                    context_parts.append("")
-            
-            if search_results.get('faq'):
-                context_parts.append("=== COMPLAINT GUIDANCE ===")
-                for result in search_results['faq']:
-                    context_parts.append(f"Q: {result['question']}")
-                    context_parts.append(f"A: {result['answer']}")
-                    context_parts.append("")
+            query_vector = (await self.searcher.agenerate_query_embeddings([english_query]))[0]
+            # The corpus version check behind the semantic cache can read the index pointer
+            response = await asyncio.to_thread(self.cached_response, english_query, query_vector, original_language)
+            if response is not None:
+                self.add_to_conversation_history(user_input, english_query, response, original_language)
+                return {"response": response, "detected_language": original_language}
             
-            context = "\n".join(context_parts)
-            
-            # Create prompt for checklist generation
-            prompt = f"""
-You are Cyberlex, a professional cyber law assistant. Generate a comprehensive, customized checklist for filing a complaint about "{complaint_type}".
-
-CONTEXT:
-{context}
-
-INSTRUCTIONS:
-1. Create a detailed, practical checklist specific to "{complaint_type}"
-2. Categorize items as Mandatory, Optional, and Financial (if applicable)
-3. Include specific file formats, size limits, and requirements
-4. Be comprehensive and professional
-5. Focus on what complainants actually need to prepare
-
-Generate a JSON response with this EXACT structure:
-{{
-    "title": "Checklist for {complaint_type} Complaint",
-    "complaint_type": "{complaint_type}",
-    "mandatory": [
-        "Item 1 with specific details",
-        "Item 2 with file format requirements",
-        "Item 3 with size limits"
-    ],
-    "optional": [
-        "Optional item 1",
-        "Optional item 2"
-    ],
-    "financial": [
-        "Financial item 1 (only if financial crime)",
-        "Financial item 2"
-    ],
-    "tips": [
-        "Helpful tip 1 for this complaint type",
-        "Helpful tip 2 specific to {complaint_type}"
-    ]
-}}
-
-SPECIFIC REQUIREMENTS FOR DIFFERENT COMPLAINT TYPES:
-- FINANCIAL FRAUD: Include bank details, transaction IDs, amounts
-- SOCIAL MEDIA: Include screenshots, URLs, account details
-- HACKING: Include system logs, incident timeline, affected accounts
-- IDENTITY THEFT: Include identity documents, fraudulent accounts
-- CYBERBULLYING: Include evidence, conversation screenshots
-- DATA BREACH: Include affected data, security measures, impact assessment
-
-Provide ONLY the JSON response, no additional text.
-"""
-
-            response = self.model.generate_content(prompt)
+            lexical_query = self.lexical_query(english_query)
+            search_results = await self.searcher.acomprehensive_search(english_query, lexical_query=lexical_query)
+            additional_searches = self.expansion_queries(english_query if lexical_query is None else lexical_query, search_results)
+            if additional_searches:
+                search_results = self.merge_expansions(
+                    search_results, await self.searcher.abatch_search_sets(additional_searches, self.expansion_limits(search_results))
+                )
+            self.log_search_results(search_results)
             
-            if response and response.text:
-                try:
-                    # Try to parse as JSON
-                    import json
-                    response_text = response.text.strip()
-                    
-                    # Clean up response if it has markdown formatting
-                    if response_text.startswith('```json'):
-                        response_text = response_text.replace('```json', '').replace('```', '').strip()
-                    elif response_text.startswith('```'):
-                        response_text = response_text.replace('```', '').strip()
-                    
-                    checklist_data = json.loads(response_text)
-                    
-                    # Validate structure
-                    required_keys = ['title', 'mandatory', 'optional']
-                    if all(key in checklist_data for key in required_keys):
-                        return checklist_data
-                    else:
-                        print("Invalid checklist structure, using fallback")
-                        return self._get_fallback_checklist(complaint_type)
-                        
-                except json.JSONDecodeError as e:
-                    print(f"JSON parse error: {e}")
-                    print(f"Response text: {response.text}")
-                    return self._get_fallback_checklist(complaint_type)
-            else:
-                return self._get_fallback_checklist(complaint_type)
-                
+            response = await self.agenerate_response(english_query, search_results, original_language, user_input)
+            await asyncio.to_thread(self.cache_response, english_query, query_vector, original_language, response)
+            self.add_to_conversation_history(user_input, english_query, response, original_language)
+            return {"response": response, "detected_language": original_language}
         except Exception as e:
-            print(f"Error generating dynamic checklist: {e}")
-            return self._get_fallback_checklist(complaint_type)
+            print(f"Error processing query: {e}")
+            return {"response": PROCESSING_ERROR_MESSAGE, "detected_language": "English"}
     
-    def _get_fallback_checklist(self, complaint_type: str) -> dict:
-        """Fallback checklist when AI generation fails"""
-        base_checklist = {
-            "title": f"Checklist for {complaint_type} Complaint",
-            "complaint_type": complaint_type,
-            "mandatory": [
-                "Incident Date and Time",
-                "Detailed incident description (minimum 200 characters) without special characters (#$@^*`''~|!)",
-                "Soft copy of national ID (Voter ID, Driving License, Passport, PAN Card, Aadhar Card) in .jpeg, .jpg, .png format (max 5 MB)",
-                "All relevant evidence related to the cyber crime (max 10 MB each)"
-            ],
-            "optional": [
-                "Suspected website URLs/Social Media handles (if applicable)",
-                "Suspect details: mobile number, email ID, bank account, address",
-                "Photograph of suspect in .jpeg, .jpg, .png format (max 5 MB)",
-                "Any other documents for suspect identification"
+    def search_metadata(self, search_results: Dict[str, Any]) -> Dict[str, Any]:
+        """What retrieval found, for clients to show before the answer arrives"""
+        return {
+            "sections": [
+                {"law_type": result.get('law_type'), "section_number": result.get('section_number'), "title": result.get('title')}
+                for result in search_results.get('cyberlaw', [])
             ],
-            "financial": [],
-            "tips": [
-                "Ensure all documents are clear and readable",
-                "Take screenshots of digital evidence before they disappear",
-                "Keep original copies of all documents safe"
-            ]
+            "faqs": [result.get('question') for result in search_results.get('faq', [])],
+            "officers": [result.get('state') for result in search_results.get('nodal_officers', [])],
+            "timings": search_results.get('timings', {})
         }
-        
-        # Add specific items based on complaint type
-        complaint_lower = complaint_type.lower()
-        
-        if any(keyword in complaint_lower for keyword in ['financial', 'fraud', 'money', 'bank', 'payment']):
-            base_checklist["financial"] = [
-                "Name of Bank/Wallet/Merchant involved",
-                "12-digit Transaction ID/UTR Number",
-                "Date and time of fraudulent transaction",
-                "Exact fraud amount",
-                "Bank statement showing the transaction"
-            ]
+    
+    def stream_query(self, user_input: str, file_path: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        process_query as a stream of events: {"event": "metadata" | "token" | "final", "data": {...}}.
+        Legal queries emit retrieval metadata, then answer tokens as Gemini generates them, then the
+        full response with its language and intent; history is recorded once generation ends.
+        Other intents and semantic cache hits arrive as a single token.
+        """
+        intent = self.detect_intent(user_input)
+        try:
+            if (intent in ("greeting", "state_response", "complaint") or (file_path and intent == "file_analysis")
+                    or not self.is_legal_query(user_input)):
+                yield {"event": "metadata", "data": {"intent": intent}}
+                response = self.process_query(user_input, file_path)
+                yield {"event": "token", "data": {"text": response}}
+                yield {"event": "final", "data": {"response": response, "detected_language": "English", "intent": intent, "complete": True}}
+                return
             
-        if any(keyword in complaint_lower for keyword in ['social', 'facebook', 'instagram', 'twitter', 'whatsapp']):
-            base_checklist["mandatory"].append("Screenshots of offending posts/messages")
-            base_checklist["optional"].append("Social media profile URLs of suspect")
+            translation = self.understand_query(user_input)
+            english_query = translation["translated_text"]
+            original_language = translation["original_language"]
             
-        if any(keyword in complaint_lower for keyword in ['hacking', 'unauthorized', 'access', 'breach']):
-            base_checklist["mandatory"].extend([
-                "System logs showing unauthorized access",
-                "Timeline of when unauthorized access was discovered",
-                "List of affected accounts/systems"
-            ])
+            query_vector = self.searcher.generate_query_embedding(english_query)
+            response = self.cached_response(english_query, query_vector, original_language)
+            if response is not None:
+                yield {"event": "metadata", "data": {"intent": intent, "cached": True}}
+                yield {"event": "token", "data": {"text": response}}
+            else:
+                search_results = self.retrieve(english_query)
+                yield {"event": "metadata", "data": dict(self.search_metadata(search_results), intent=intent, cached=False)}
+                
+                chunks = []
+                outcome = {"failed": False}
+                for text in self.stream_response(english_query, search_results, original_language, user_input, outcome):
+                    chunks.append(text)
+                    yield {"event": "token", "data": {"text": text}}
+                response = "".join(chunks).strip()
+                if outcome["failed"]:
+                    # A partial answer with an error appended is neither cached nor remembered
+                    yield {"event": "final", "data": {"response": response, "detected_language": original_language, "intent": intent, "complete": False}}
+                    return
+                self.cache_response(english_query, query_vector, original_language, response)
             
-        return base_checklist
+            self.add_to_conversation_history(user_input, english_query, response, original_language)
+            yield {"event": "final", "data": {"response": response, "detected_language": original_language, "intent": intent, "complete": True}}
+        except Exception as e:
+            print(f"Error streaming query: {e}")
+            yield {"event": "token", "data": {"text": PROCESSING_ERROR_MESSAGE}}
+            yield {"event": "final", "data": {"response": PROCESSING_ERROR_MESSAGE, "detected_language": "English", "intent": intent, "complete": False}}
     
     def handle_complaint_initiation(self, user_input: str) -> str:
         """Handle complaint collection initiation"""
@@ -835,7 +967,7 @@ Provide ONLY the JSON response, no additional text.
             search_query = " ".join(issue_types).replace("_", " ") + " cyber crime law"
             
             # Search for relevant legal sections
-            search_results = self.searcher.comprehensive_search(search_query)
+            search_results = self.searcher.comprehensive_search(search_query, endpoint="file_analysis")
             
             # Generate contextual legal advice
             if search_results.get("cyberlaw") or search_results.get("faq"):
@@ -847,6 +979,10 @@ Provide ONLY the JSON response, no additional text.
             print(f"Error generating file-based legal advice: {e}")
             return "**💡 LEGAL GUIDANCE**: Please describe the specific legal issues you'd like help with based on the file content."
     
+    def reset_session(self):
+        """Forget the conversation; searcher, caches and models stay in use by in-flight requests"""
+        self.conversation_history = []
+    
     def close(self):
         """Clean up resources"""
         if hasattr(self, 'searcher'):
@@ -857,10 +993,35 @@ Provide ONLY the JSON response, no additional text.
         try:
             print(f"Generating dynamic checklist for: {complaint_type}")
             
+            # Ground the checklist in the relevant sections and complaint FAQs, pruned with the checklist policy
+            search_results = self.searcher.comprehensive_search(
+                f"complaint checklist {complaint_type} required documents evidence", endpoint="checklist"
+            )
+            
+            context_parts = []
+            if search_results.get('cyberlaw'):
+                context_parts.append("=== RELEVANT LEGAL REQUIREMENTS ===")
+                for result in search_results['cyberlaw']:
+                    context_parts.append(f"Section {result['section_number']}: {result['title']}")
+                    context_parts.append(f"Content: {result['content']}")
+                    context_parts.append("")
+            
+            if search_results.get('faq'):
+                context_parts.append("=== COMPLAINT GUIDANCE ===")
+                for result in search_results['faq']:
+                    context_parts.append(f"Q: {result['question']}")
+                    context_parts.append(f"A: {result['answer']}")
+                    context_parts.append("")
+            
+            context = "\n".join(context_parts)
+            
             # Use AI to generate customized checklist
             prompt = f"""
 You are Cyberlex, a professional cyber law assistant. Generate a comprehensive, customized checklist for filing a complaint about "{complaint_type}".
 
+CONTEXT:
+{context}
+
 Based on the complaint type "{complaint_type}", provide a specific and actionable checklist. Consider what evidence and information would be most important for this particular type of cyber crime.
 
 Provide your response in this EXACT JSON format:
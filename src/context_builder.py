@@ -0,0 +1,153 @@
+"""
+Context Builder
+Assembles the retrieved sections, FAQs, contacts and recent conversation for the answer prompt
+within CONTEXT_TOKEN_BUDGET tokens (estimated locally at ~4 characters per token). Each source
+gets a share of the budget, shares a source does not use pass to the others, and within a source
+entries are kept in rank order: the first entry that no longer fits is truncated and the rest dropped.
+"""
+
+import math
+import os
+from typing import Any, Dict, List, Tuple
+
+CHARS_PER_TOKEN = 4
+
+# Budget share per source, in priority order for redistributing unused shares
+SOURCE_SHARES = {"cyberlaw": 0.55, "faq": 0.2, "nodal_officers": 0.1, "history": 0.15}
+
+SOURCE_HEADERS = {
+    "cyberlaw": "=== RELEVANT CYBER LAW SECTIONS ===",
+    "faq": "=== RELEVANT FAQs ===",
+    "nodal_officers": "=== RELEVANT CONTACT INFORMATION ===",
+    "history": "=== RECENT CONVERSATION (for reference) ==="
+}
+
+# A truncated entry shorter than this is dropped instead
+MIN_TRUNCATED_TOKENS = 30
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini models without calling count_tokens"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text to about `tokens` tokens at a word boundary"""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:max(limit - 1, 0)]
+    if " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip() + "…"
+
+class ContextBuilder:
+    def __init__(self, act_categorizer, token_budget: int = None, shares: Dict[str, float] = None):
+        self.act_categorizer = act_categorizer
+        self.token_budget = token_budget or int(os.getenv('CONTEXT_TOKEN_BUDGET', '2500'))
+        self.shares = shares or SOURCE_SHARES
+    
+    def section_entry(self, result: Dict[str, Any]) -> str:
+        """Colored header plus summary; content is only added when it says more than title and summary"""
+        summary = result.get('summary', '')
+        content = result.get('content', '')
+        lines = [
+            self.act_categorizer.format_colored_section(
+                result['section_number'], result['title'], result['law_type'], summary + ' ' + content
+            ),
+            f"Summary: {summary}"
+        ]
+        # Content is built as "Section N: title\nsummary"; it only repeats a non-empty summary it contains
+        if content and not (summary and summary in content):
+            lines.append(f"Content: {content}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def faq_entry(result: Dict[str, Any]) -> str:
+        return f"Q: {result['question']}\nA: {result['answer']}"
+    
+    @staticmethod
+    def officer_entry(result: Dict[str, Any]) -> str:
+        lines = [
+            f"State: {result['state']}",
+            f"Nodal Officer: {result['officer_name']} ({result['rank']})",
+            f"Email: {result['email']}"
+        ]
+        if result.get('contact'):
+            lines.append(f"Contact: {result['contact']}")
+        return "\n".join(lines)
+    
+    @staticmethod
+    def history_entries(conversation_history: List[Dict[str, Any]], max_turns: int) -> List[str]:
+        """Recent turns, most recent first"""
+        entries = []
+        for i, turn in enumerate(reversed(conversation_history[-max_turns:])):
+            entries.append(f"Turn {len(conversation_history) - i}: User asked: {turn['user_original']}\n"
+                           f"Bot replied: {turn['bot_reply'][:100]}...")
+        return entries
+    
+    def allocate(self, needs: Dict[str, int]) -> Dict[str, int]:
+        """Split the budget by share, then hand unused tokens to sources that want more, in priority order"""
+        allocation = {source: min(need, int(self.token_budget * self.shares.get(source, 0))) for source, need in needs.items()}
+        spare = self.token_budget - sum(allocation.values())
+        for source in sorted(needs, key=lambda s: list(self.shares).index(s) if s in self.shares else len(self.shares)):
+            extra = min(spare, needs[source] - allocation[source])
+            if extra > 0:
+                allocation[source] += extra
+                spare -= extra
+        return allocation
+    
+    @staticmethod
+    def fill(header: str, entries: List[str], budget: int) -> Tuple[List[str], int, int]:
+        """Header plus entries in rank order within budget: (lines, tokens used, entries dropped)"""
+        used = estimate_tokens(header)
+        if not entries or used >= budget:
+            return [], 0, len(entries)
+        
+        lines = [header]
+        for index, entry in enumerate(entries):
+            cost = estimate_tokens(entry) + 1
+            if used + cost <= budget:
+                lines.extend([entry, ""])
+                used += cost
+                continue
+            remaining = budget - used - 1
+            if remaining >= MIN_TRUNCATED_TOKENS:
+                truncated = truncate_to_tokens(entry, remaining)
+                lines.extend([truncated, ""])
+                used += estimate_tokens(truncated) + 1
+                return lines, used, len(entries) - index - 1
+            return lines, used, len(entries) - index
+        return lines, used, 0
+    
+    def build(self, search_results: Dict[str, List[Dict[str, Any]]], conversation_history: List[Dict[str, Any]] = (),
+              max_history_turns: int = 6) -> Dict[str, Any]:
+        """
+        Context and history text within the token budget.
+        Returns {"context", "history", "tokens": {source: used, "total", "budget"}, "dropped": {source: entries}}
+        """
+        entries = {
+            "cyberlaw": [self.section_entry(result) for result in search_results.get('cyberlaw', [])],
+            "faq": [self.faq_entry(result) for result in search_results.get('faq', [])],
+            "nodal_officers": [self.officer_entry(result) for result in search_results.get('nodal_officers', [])],
+            "history": self.history_entries(list(conversation_history), max_history_turns)
+        }
+        needs = {
+            source: estimate_tokens(SOURCE_HEADERS[source]) + sum(estimate_tokens(entry) + 1 for entry in items) if items else 0
+            for source, items in entries.items()
+        }
+        allocation = self.allocate(needs)
+        
+        sections = {}
+        tokens = {}
+        dropped = {}
+        for source, items in entries.items():
+            lines, tokens[source], dropped[source] = self.fill(SOURCE_HEADERS[source], items, allocation[source])
+            sections[source] = "\n".join(lines)
+        
+        tokens["total"] = sum(tokens.values())
+        tokens["budget"] = self.token_budget
+        return {
+            "context": "\n".join(sections[source] for source in ("cyberlaw", "faq", "nodal_officers") if sections[source]),
+            "history": f"\n{sections['history']}" if sections["history"] else "",
+            "tokens": tokens,
+            "dropped": dropped
+        }
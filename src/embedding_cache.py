@@ -0,0 +1,89 @@
+"""
+Query Embedding Cache
+Content-addressed cache for embedding vectors, keyed by normalized text, model name and task_type.
+Vectors are kept in a bounded in-memory LRU and persisted to disk as packed float32.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import unicodedata
+from array import array
+from typing import Awaitable, Callable, Dict, List
+from persistent_cache import PersistentLRUCache
+
+class EmbeddingCache(PersistentLRUCache):
+    def __init__(self, db_path: str = None, max_entries: int = None):
+        super().__init__(
+            db_path or os.getenv('EMBEDDING_CACHE_PATH', 'CYBERLAW_CHATBOT/cache/embeddings.sqlite3'),
+            table="embeddings",
+            max_entries=max_entries or int(os.getenv('EMBEDDING_CACHE_SIZE', '4096'))
+        )
+    
+    def encode(self, value: List[float]) -> bytes:
+        return array('f', value).tobytes()
+    
+    def decode(self, data: bytes) -> List[float]:
+        vector = array('f')
+        vector.frombytes(data)
+        return vector.tolist()
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize unicode form, case and whitespace so trivially different queries share an entry"""
+        return " ".join(unicodedata.normalize('NFKC', text).casefold().split())
+    
+    def make_key(self, text: str, model: str, task_type: str) -> str:
+        """Content address for a (text, model, task_type) triple"""
+        material = f"{model}\x00{task_type}\x00{self.normalize_text(text)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _lookup(self, texts: List[str], model: str, task_type: str):
+        """Cached vectors (None where missing) and the indexes of each missing key"""
+        keys = [self.make_key(text, model, task_type) for text in texts]
+        vectors = [self.get(key) for key in keys]
+        
+        missing = {}
+        for index, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[index], []).append(index)
+        return vectors, missing
+    
+    def _store(self, vectors: List[List[float]], missing: Dict[str, List[int]], embedded: List[List[float]]):
+        for (key, indexes), vector in zip(missing.items(), embedded):
+            if vector:
+                self.put(key, list(vector))
+            for index in indexes:
+                vectors[index] = vector or []
+    
+    def get_or_embed(self, texts: List[str], model: str, task_type: str,
+                     embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Return one vector per text, calling embed_fn once with only the texts that are not cached.
+        Empty vectors from embed_fn are returned as-is and never cached.
+        """
+        vectors, missing = self._lookup(texts, model, task_type)
+        if missing:
+            self._store(vectors, missing, embed_fn([texts[indexes[0]] for indexes in missing.values()]))
+        return vectors
+    
+    async def aget_or_embed(self, texts: List[str], model: str, task_type: str,
+                            aembed_fn: Callable[[List[str]], Awaitable[List[List[float]]]]) -> List[List[float]]:
+        """get_or_embed with an async embedding function; the SQLite tier is read and written in a worker thread"""
+        vectors, missing = await asyncio.to_thread(self._lookup, texts, model, task_type)
+        if missing:
+            embedded = await aembed_fn([texts[indexes[0]] for indexes in missing.values()])
+            await asyncio.to_thread(self._store, vectors, missing, embedded)
+        return vectors
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or initialize the process-wide embedding cache"""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+        return _embedding_cache
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Ingestion Embedding Pipeline
+Embeds documents in batches on a bounded worker pool, throttled by a token-bucket
+rate limiter, retrying rate-limit and transient errors with exponential backoff.
+Raises EmbeddingError instead of ever returning an empty vector.
+"""
+
+import os
+import random
+import threading
+import time
+import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+class EmbeddingError(Exception):
+    """Raised when a text could not be embedded"""
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` tokens refill continuously up to `capacity`"""
+    
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+class EmbeddingPipeline:
+    def __init__(self, model: str, task_type: str = "retrieval_document", batch_size: int = None,
+                 max_workers: int = None, requests_per_minute: float = None, max_retries: int = 5,
+                 embed_fn: Callable[[List[str]], List[List[float]]] = None):
+        self.model = model
+        self.task_type = task_type
+        self.batch_size = batch_size or int(os.getenv('EMBED_BATCH_SIZE', '100'))
+        self.max_workers = max_workers or int(os.getenv('EMBED_WORKERS', '4'))
+        self.rate_limiter = TokenBucket(requests_per_minute or float(os.getenv('EMBED_REQUESTS_PER_MINUTE', '150')))
+        self.max_retries = max_retries
+        self.embed_fn = embed_fn or self._embed_with_gemini
+        
+        self.stats = {"requests": 0, "retries": 0, "texts": 0}
+        self.stats_lock = threading.Lock()
+    
+    def _embed_with_gemini(self, texts: List[str]) -> List[List[float]]:
+        result = genai.embed_content(model=self.model, content=texts, task_type=self.task_type)
+        return result['embedding']
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Rate limits (429 / quota / ResourceExhausted) and transient server errors"""
+        message = f"{type(error).__name__} {error}".lower()
+        return any(marker in message for marker in [
+            "429", "quota", "resourceexhausted", "rate limit",
+            "500", "503", "unavailable", "deadline", "timeout", "internalservererror"
+        ])
+    
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch, retrying with exponential backoff and jitter"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            with self.stats_lock:
+                self.stats["requests"] += 1
+            try:
+                vectors = self.embed_fn(batch)
+                break
+            except Exception as e:
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise EmbeddingError(f"Embedding batch of {len(batch)} texts failed: {e}") from e
+                delay = min(60.0, 2 ** attempt) + random.uniform(0, 1)
+                print(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+                with self.stats_lock:
+                    self.stats["retries"] += 1
+                time.sleep(delay)
+        
+        if len(vectors) != len(batch):
+            raise EmbeddingError(f"Expected {len(batch)} embeddings, got {len(vectors)}")
+        for text, vector in zip(batch, vectors):
+            if not vector:
+                raise EmbeddingError(f"Empty embedding returned for: {text[:80]!r}")
+        
+        with self.stats_lock:
+            self.stats["texts"] += len(batch)
+        return vectors
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed all texts, preserving order"""
+        if not texts:
+            return []
+        
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            results = list(executor.map(self._embed_batch, batches))
+        
+        vectors = []
+        for batch_vectors in results:
+            vectors.extend(batch_vectors)
+        return vectors
@@ -1,6 +1,11 @@
+import asyncio
+import json
 import os
+import sys
 import google.generativeai as genai
 from dotenv import load_dotenv
+from language_detector import detect_language
+from translation_cache import get_translation_cache
 
 load_dotenv()
 
@@ -11,32 +16,119 @@ class GeminiTranslationModule:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.model_name = 'gemini-2.0-flash-exp'
+        self.model = genai.GenerativeModel(self.model_name)
         
-    def translate_to_english(self, text):
-        try:
-            prompt = f"""
+        # Normalized source text + model -> English translation, shared across instances
+        self.cache = get_translation_cache()
+        
+    @staticmethod
+    def build_prompt(text):
+        return f"""
 Convert the following text to clean, natural English suitable for semantic search. If already in proper English, return unchanged. For other languages, translate accurately while preserving technical terms like FIR, cyber crime, etc.
 
 Input: "{text}"
 
 Output:"""
-
-            response = self.model.generate_content(prompt)
-            
-            if response and response.text:
-                translated = response.text.strip().replace('"', '').replace("'", '').strip()
-                if translated and translated[0].islower():
-                    translated = translated[0].upper() + translated[1:]
-                return translated
-            else:
-                return text
+    
+    @staticmethod
+    def clean_translation(response, text):
+        if response and response.text:
+            translated = response.text.strip().replace('"', '').replace("'", '').strip()
+            if translated and translated[0].islower():
+                translated = translated[0].upper() + translated[1:]
+            return translated
+        else:
+            return text
+    
+    def cache_key(self, text):
+        return self.cache.make_key(text, self.model_name)
+    
+    def remember(self, key, response, text):
+        """Clean the model output and cache it; empty responses are returned as the input and not cached"""
+        translated = self.clean_translation(response, text)
+        if response and response.text:
+            self.cache.put(key, translated)
+        return translated
+    
+    def translate_to_english(self, text):
+        key = self.cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self.model.generate_content(self.build_prompt(text))
+            return self.remember(key, response, text)
                 
         except Exception:
             return text
+    
+    async def atranslate_to_english(self, text):
+        """Async variant of translate_to_english (generate_content_async); cache I/O runs in a worker thread"""
+        key = self.cache_key(text)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.model.generate_content_async(self.build_prompt(text))
+            return await asyncio.to_thread(self.remember, key, response, text)
+        except Exception:
+            return text
+    
+    def prewarm(self, phrases):
+        """Translate and cache common non-English phrases ahead of time: {"cached", "translated", "failed", "skipped"}"""
+        counts = {"cached": 0, "translated": 0, "failed": 0, "skipped": 0}
+        for phrase in phrases:
+            phrase = phrase.strip()
+            if not phrase or not detect_language(phrase)["needs_translation"]:
+                counts["skipped"] += 1
+                continue
+            key = self.cache_key(phrase)
+            if self.cache.get(key) is not None:
+                counts["cached"] += 1
+                continue
+            try:
+                response = self.model.generate_content(self.build_prompt(phrase))
+                self.remember(key, response, phrase)
+                counts["translated" if response and response.text else "failed"] += 1
+            except Exception as e:
+                print(f"Error pre-warming translation for '{phrase}': {e}")
+                counts["failed"] += 1
+        print(f"Translation cache pre-warm: {counts}")
+        return counts
+    
+    @staticmethod
+    def load_phrases(path):
+        """Phrase list from a JSON array or a text file with one phrase per line"""
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        if path.endswith('.json'):
+            return [str(phrase) for phrase in json.loads(content)]
+        return [line for line in content.splitlines() if line.strip()]
+    
+    def detect_language_and_translate(self, text):
+        """Language detected locally; only non-English text is sent for translation"""
+        detected = detect_language(text)
+        if not detected["needs_translation"]:
+            return {"original_language": "English", "translated_text": text}
+        return {"original_language": detected["language"], "translated_text": self.translate_to_english(text)}
+    
+    async def adetect_language_and_translate(self, text):
+        """Async variant of detect_language_and_translate"""
+        detected = detect_language(text)
+        if not detected["needs_translation"]:
+            return {"original_language": "English", "translated_text": text}
+        return {"original_language": detected["language"], "translated_text": await self.atranslate_to_english(text)}
 
 if __name__ == "__main__":
-    user_input = input("Enter text: ")
     translator = GeminiTranslationModule()
-    result = translator.translate_to_english(user_input)
-    print(result)
+    if len(sys.argv) == 3 and sys.argv[1] == "--prewarm":
+        translator.prewarm(translator.load_phrases(sys.argv[2]))
+        print(translator.cache.stats())
+        sys.exit(0)
+    
+    user_input = input("Enter text: ")
+    result = translator.detect_language_and_translate(user_input)
+    print(f"{result['original_language']}: {result['translated_text']}")
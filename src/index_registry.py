@@ -0,0 +1,146 @@
+"""
+Index Registry for Blue/Green Reindexing
+Ingestion builds versioned collections (CyberLaw_v42, FAQ_v42, ...) and then switches a single
+pointer object to them; searchers resolve logical collection names through that pointer.
+Because the pointer is one object, every collection switches atomically.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import weaviate
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from weaviate_connection import WeaviateConnectionManager
+
+class IndexRegistry:
+    POINTER_COLLECTION = "IndexPointer"
+    POINTER_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, "cyberlaw-chatbot/IndexPointer/active"))
+    
+    def __init__(self, client, ttl: float = None):
+        # A client, or a WeaviateConnectionManager so reconnects are picked up
+        self.connection = client
+        self.ttl = ttl if ttl is not None else float(os.getenv('INDEX_POINTER_TTL', '60'))
+        self.lock = threading.Lock()
+        self.cached_pointer = None
+        self.cached_at = 0.0
+    
+    @property
+    def client(self):
+        if isinstance(self.connection, WeaviateConnectionManager):
+            return self.connection.client()
+        return self.connection
+    
+    @staticmethod
+    def versioned_name(base: str, version: int) -> str:
+        return f"{base}_v{version}"
+    
+    def read_pointer(self) -> Optional[Dict[str, Any]]:
+        """Fetch the active pointer: {"version": int, "collections": {logical: physical}, ...}"""
+        try:
+            if not self.client.collections.exists(self.POINTER_COLLECTION):
+                return None
+            item = self.client.collections.get(self.POINTER_COLLECTION).query.fetch_object_by_id(self.POINTER_ID)
+            if item is None:
+                return None
+            return json.loads(item.properties.get('payload', '{}'))
+        except Exception as e:
+            print(f"Error reading index pointer: {e}")
+            return None
+    
+    def pointer(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Active pointer, cached for `ttl` seconds"""
+        with self.lock:
+            if force or time.monotonic() - self.cached_at > self.ttl:
+                pointer = self.read_pointer()
+                # Keep serving the last known pointer if the read failed
+                if pointer is not None or self.cached_pointer is None:
+                    self.cached_pointer = pointer
+                self.cached_at = time.monotonic()
+            return self.cached_pointer
+    
+    def collection_name(self, logical_name: str) -> str:
+        """Physical collection currently behind a logical name (the name itself if no pointer exists)"""
+        pointer = self.pointer()
+        if pointer:
+            return pointer.get("collections", {}).get(logical_name, logical_name)
+        return logical_name
+    
+    @staticmethod
+    def new_corpus_version() -> str:
+        return datetime.now().strftime('%Y%m%d%H%M%S%f')
+    
+    def write_pointer(self, version: int, collections: Dict[str, str], **extra):
+        """
+        Atomically point every logical name at its new physical collection.
+        Each write stamps a new corpus_version, which keys searchers' retrieval caches.
+        """
+        if not self.client.collections.exists(self.POINTER_COLLECTION):
+            self.client.collections.create(
+                name=self.POINTER_COLLECTION,
+                properties=[
+                    weaviate.classes.config.Property(name="payload", data_type=weaviate.classes.config.DataType.TEXT)
+                ]
+            )
+        
+        payload = dict(extra, version=version, collections=collections, updated=datetime.now().isoformat())
+        payload.setdefault("corpus_version", self.new_corpus_version())
+        properties = {"payload": json.dumps(payload)}
+        pointer_collection = self.client.collections.get(self.POINTER_COLLECTION)
+        if pointer_collection.data.exists(self.POINTER_ID):
+            pointer_collection.data.replace(uuid=self.POINTER_ID, properties=properties)
+        else:
+            pointer_collection.data.insert(properties=properties, uuid=self.POINTER_ID)
+        
+        with self.lock:
+            self.cached_pointer = payload
+            self.cached_at = time.monotonic()
+    
+    def bump_corpus_version(self, bases: List[str]) -> str:
+        """Stamp a new corpus_version on the active pointer after an in-place ingest; returns it"""
+        pointer = self.pointer(force=True) or {}
+        collections = pointer.get("collections") or {base: base for base in bases}
+        extra = {key: value for key, value in pointer.items() if key not in ("version", "collections", "updated", "corpus_version")}
+        corpus_version = self.new_corpus_version()
+        self.write_pointer(pointer.get("version", 0), collections, corpus_version=corpus_version, **extra)
+        return corpus_version
+    
+    def versions(self, base: str) -> List[int]:
+        """Existing version numbers for a logical collection, ascending"""
+        pattern = re.compile(rf"^{re.escape(base)}_v(\d+)$")
+        versions = []
+        for name in self.client.collections.list_all(simple=True):
+            match = pattern.match(name)
+            if match:
+                versions.append(int(match.group(1)))
+        return sorted(versions)
+    
+    def next_version(self, bases: List[str]) -> int:
+        pointer = self.pointer(force=True)
+        current = pointer.get("version", 0) if pointer else 0
+        existing = [version for base in bases for version in self.versions(base)]
+        return max([current] + existing) + 1
+    
+    def garbage_collect(self, bases: List[str], keep: int = 2) -> List[str]:
+        """Delete old versioned collections, keeping the newest `keep` and whatever is active"""
+        pointer = self.pointer(force=True)
+        active = set(pointer.get("collections", {}).values()) if pointer else set()
+        
+        deleted = []
+        for base in bases:
+            # The unversioned collection from before blue/green counts as version 0
+            candidates = [(version, self.versioned_name(base, version)) for version in self.versions(base)]
+            if self.client.collections.exists(base):
+                candidates.insert(0, (0, base))
+            
+            for version, name in candidates[:-keep] if keep > 0 else candidates:
+                if name not in active:
+                    self.client.collections.delete(name)
+                    deleted.append(name)
+        
+        if deleted:
+            print(f"Garbage-collected collections: {', '.join(deleted)}")
+        return deleted
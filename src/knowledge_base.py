@@ -0,0 +1,259 @@
+"""
+Knowledge Base Loaders
+Turns the JSON files in Knowledge_base/ into collection records:
+{"key": stable identifier, "properties": Weaviate properties, "text": text to embed}
+Files are parsed incrementally (JsonArrayStream) so large statute and judgment dumps never
+have to fit in memory at once.
+"""
+
+import codecs
+import json
+import os
+import uuid
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+KNOWLEDGE_BASE_PATH = "Knowledge_base"
+
+def record_uuid(collection_name: str, key: str) -> str:
+    """Deterministic object id for a record, stable across ingest runs"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"cyberlaw-chatbot/{collection_name}/{key}"))
+
+def bns_record(section: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    content = f"Section {section['section_number']}: {section['title']}\n{section['summary']}"
+    return {
+        "key": f"BNS:{section['section_number']}",
+        "text": content,
+        "properties": {
+            "section_number": section['section_number'],
+            "title": section['title'],
+            "content": content,
+            "law_type": "BNS",
+            "summary": section['summary'],
+            "full_text": json.dumps(section['full_legal_text']),
+            "source_file": source_file
+        }
+    }
+
+def ipc_record(section: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    content = f"Section {section['section_number']}: {section['title']}\n{section['plain_english']}"
+    
+    full_text = section['official_text']
+    if isinstance(full_text, dict):
+        full_text = json.dumps(full_text)
+    
+    return {
+        "key": f"IPC:{section['section_number']}",
+        "text": content,
+        "properties": {
+            "section_number": section['section_number'],
+            "title": section['title'],
+            "content": content,
+            "law_type": "IPC",
+            "summary": section['plain_english'],
+            "full_text": str(full_text),
+            "source_file": source_file
+        }
+    }
+
+def it_act_record(section: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    content = f"Section {section['section_number']}: {section['title']}\n{section['summary']}"
+    return {
+        "key": f"IT_ACT:{section['section_number']}",
+        "text": content,
+        "properties": {
+            "section_number": section['section_number'],
+            "title": section['title'],
+            "content": content,
+            "law_type": "IT_ACT",
+            "summary": section['summary'],
+            "full_text": json.dumps(section['full_legal_text']),
+            "source_file": source_file
+        }
+    }
+
+def faq_record(item: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    return {
+        "key": f"{source_file}:{item['question']}",
+        "text": f"Q: {item['question']}\nA: {item['answer']}",
+        "properties": {
+            "question": item['question'],
+            "answer": item['answer'],
+            "category": "cybercrime_faq",
+            "source_file": source_file
+        }
+    }
+
+def nodal_officer_record(officer: Dict[str, Any], source_file: str) -> Dict[str, Any]:
+    return {
+        "key": officer['state_ut'],
+        "text": f"State: {officer['state_ut']}\nNodal Officer: {officer['nodal_officer']['name']}, {officer['nodal_officer']['rank']}\nEmail: {officer['nodal_officer']['email']}",
+        "properties": {
+            "state": officer['state_ut'],
+            "officer_name": officer['nodal_officer']['name'],
+            "rank": officer['nodal_officer']['rank'],
+            "email": officer['nodal_officer']['email'],
+            "contact": officer.get('grievance_officer', {}).get('contact', ''),
+            "source_file": source_file
+        }
+    }
+
+# (file name, target collection, key holding the item list or None for a top-level list, record builder)
+KNOWLEDGE_BASE_SOURCES = [
+    ("bns.json", "CyberLaw", "bns_sections", bns_record),
+    ("ipc.json", "CyberLaw", "ipc_sections", ipc_record),
+    ("it.json", "CyberLaw", "it_act_sections", it_act_record),
+    ("cybercrime_faq_dynamic.json", "FAQ", "faqs", faq_record),
+    ("faq.json", "FAQ", "faqs", faq_record),
+    ("nodal_officers.json", "NodalOfficer", None, nodal_officer_record)
+]
+
+class JsonArrayStream:
+    """
+    Iterates the items of a JSON array (top-level, or under a top-level key) reading the file in
+    chunks, so memory holds one item plus a read buffer instead of the whole document
+    """
+    
+    WHITESPACE = " \t\n\r"
+    MAX_READ_SIZE = 16 * 1024 * 1024
+    
+    def __init__(self, file_path: str, items_key: str = None, chunk_size: int = 64 * 1024):
+        self.file_path = file_path
+        self.items_key = items_key
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(file_path)
+        self.bytes_read = 0
+        self.items = 0
+        
+        self.decoder = json.JSONDecoder()
+        self.file = None
+        self.text_decoder = None
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of the file read so far"""
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+    
+    def _fill(self, size: int = None) -> bool:
+        """Append the next chunk to the buffer, dropping what has been consumed; False at end of file"""
+        if self.eof:
+            return False
+        data = self.file.read(size or self.chunk_size)
+        self.bytes_read = self.file.tell()
+        self.eof = not data
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return not self.eof
+    
+    def _peek(self) -> str:
+        """Next non-whitespace character ('' at end of file) without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+    
+    def _decode_value(self) -> Any:
+        """Decode the JSON value at the current position, reading more input until it is complete"""
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number running to the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads for large items so re-decoding from the item start stays cheap
+            read_size = min(read_size * 2, self.MAX_READ_SIZE)
+            self._fill(read_size)
+    
+    def _seek_items(self) -> bool:
+        """Position the stream on the opening bracket of the item array"""
+        first = self._peek()
+        if first == "[":
+            return True
+        if first != "{" or self.items_key is None:
+            return False
+        
+        self.pos += 1
+        while True:
+            char = self._peek()
+            if char in ("}", ""):
+                return False
+            if char == ",":
+                self.pos += 1
+                continue
+            key = self._decode_value()
+            if self._peek() != ":":
+                raise ValueError(f"Malformed JSON object in {self.file_path}")
+            self.pos += 1
+            if key == self.items_key and self._peek() == "[":
+                return True
+            self._decode_value()
+    
+    def __iter__(self) -> Iterator[Any]:
+        with open(self.file_path, 'rb') as f:
+            self.file = f
+            self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+            self.buffer, self.pos, self.eof = "", 0, False
+            
+            if not self._seek_items():
+                print(f"Unknown format in {self.file_path}")
+                return
+            
+            self.pos += 1
+            while True:
+                char = self._peek()
+                if char == "]":
+                    return
+                if char == ",":
+                    self.pos += 1
+                    continue
+                if char == "":
+                    raise ValueError(f"Unexpected end of file in {self.file_path}")
+                item = self._decode_value()
+                self.items += 1
+                yield item
+
+def iter_chunks(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_records(stream: JsonArrayStream, record_builder) -> Iterator[Dict[str, Any]]:
+    """Build collection records lazily from a knowledge base file stream"""
+    source_file = os.path.basename(stream.file_path)
+    for item in stream:
+        yield record_builder(item, source_file)
+
+def load_items(file_path: str, items_key: str = None) -> List[Dict[str, Any]]:
+    """Read the item list from a knowledge base file (either a top-level list or a list under items_key)"""
+    return list(JsonArrayStream(file_path, items_key))
+
+def load_records(file_path: str, items_key: str, record_builder) -> List[Dict[str, Any]]:
+    """Build the collection records for one knowledge base file"""
+    return list(iter_records(JsonArrayStream(file_path, items_key), record_builder))
+
+def load_all_records(knowledge_base_path: str = KNOWLEDGE_BASE_PATH) -> Dict[str, List[Dict[str, Any]]]:
+    """Build records for every knowledge base file, grouped by collection name"""
+    records = {}
+    for filename, collection_name, items_key, record_builder in KNOWLEDGE_BASE_SOURCES:
+        records.setdefault(collection_name, [])
+        file_path = os.path.join(knowledge_base_path, filename)
+        if os.path.exists(file_path):
+            records[collection_name].extend(load_records(file_path, items_key, record_builder))
+        else:
+            print(f"File {filename} not found")
+    return records
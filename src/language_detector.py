@@ -0,0 +1,156 @@
+"""
+Language Detector
+Identifies the language of a user query locally, from the Unicode script of its letters plus a
+romanized-Hindi (Hinglish) word heuristic and an English stopword check, so plain English queries
+skip the translation LLM call and other queries report their actual language instead of "Other".
+"""
+
+import re
+from typing import Dict
+
+# Unicode block -> script
+SCRIPT_RANGES = [
+    (0x0600, 0x06FF, "Arabic"),
+    (0x0900, 0x097F, "Devanagari"),
+    (0x0980, 0x09FF, "Bengali"),
+    (0x0A00, 0x0A7F, "Gurmukhi"),
+    (0x0A80, 0x0AFF, "Gujarati"),
+    (0x0B00, 0x0B7F, "Odia"),
+    (0x0B80, 0x0BFF, "Tamil"),
+    (0x0C00, 0x0C7F, "Telugu"),
+    (0x0C80, 0x0CFF, "Kannada"),
+    (0x0D00, 0x0D7F, "Malayalam"),
+    (0xA8E0, 0xA8FF, "Devanagari")
+]
+
+SCRIPT_LANGUAGES = {
+    "Arabic": "Urdu",
+    "Devanagari": "Hindi",
+    "Bengali": "Bengali",
+    "Gurmukhi": "Punjabi",
+    "Gujarati": "Gujarati",
+    "Odia": "Odia",
+    "Tamil": "Tamil",
+    "Telugu": "Telugu",
+    "Kannada": "Kannada",
+    "Malayalam": "Malayalam"
+}
+
+# Common Marathi words that Hindi does not use; Devanagari text containing one is Marathi
+MARATHI_MARKERS = {
+    "आहे", "आहेत", "नाही", "नाहीत", "माझा", "माझी", "माझे", "मला", "तुम्ही", "काय", "कसे", "कशी",
+    "झाले", "झाला", "झाली", "आणि", "पण", "कोणत्या", "करावी", "करावे", "साठी", "मध्ये"
+}
+
+# Assamese letters (ra, wa) that Bengali does not have
+ASSAMESE_LETTERS = {"ৰ", "ৱ"}
+
+# Romanized Hindi function words; English homographs ("to", "me", "main", "hi") are left out
+HINGLISH_MARKERS = {
+    "hai", "hain", "tha", "thi", "kya", "kyu", "kyun", "kyon", "kaise", "kaisa", "kaun", "kab", "kahan",
+    "mera", "meri", "mere", "mujhe", "mujhko", "hum", "humne", "maine", "aap", "aapka", "tum", "tera", "uska",
+    "nahi", "nahin", "nhi", "haan", "ji", "aur", "ke", "ka", "ki", "ko", "se", "mein", "mai", "par", "pe",
+    "yeh", "ye", "woh", "vo", "koi", "kuch", "sab", "bhi", "sirf", "abhi",
+    "kar", "karo", "karna", "karein", "karu", "karun", "kiya", "kiye", "hua", "hui", "hue", "gaya", "gayi", "gaye",
+    "kare", "kaisi", "raha", "rahi", "rahe", "hoga", "hogi", "chahiye", "sakta", "sakti", "sakte", "batao", "bataye", "bataiye",
+    "paisa", "paise", "rupaye", "shikayat", "madad", "dhokha", "kaha", "wala", "wali", "liye", "baad", "pehle"
+}
+
+# Queries of up to HINGLISH_SHORT_QUERY_WORDS words need one marker ("phishing complaint kaise kare");
+# longer ones need at least two markers making up a share of their words
+HINGLISH_SHORT_QUERY_WORDS = 4
+HINGLISH_MIN_WORDS = 2
+HINGLISH_MIN_RATIO = 0.3
+
+# English function words; Latin text needs a share of them to skip translation
+ENGLISH_MARKERS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am", "do", "does", "did", "has", "have", "had",
+    "i", "me", "my", "you", "your", "he", "she", "his", "her", "it", "its", "we", "our", "they", "their", "them",
+    "someone", "somebody", "this", "that", "these", "those", "what", "which", "who", "whom", "how", "when", "where", "why",
+    "of", "to", "in", "on", "for", "from", "with", "without", "by", "at", "about", "under", "into", "after", "against",
+    "and", "or", "not", "no", "if", "can", "could", "should", "would", "will", "shall", "may", "must", "any", "there"
+}
+
+# Queries this short are usually keywords ("IT Act 66C", "phishing complaint") and count as English;
+# accented letters are rare in English, so text with them needs a larger share of English words
+ENGLISH_KEYWORD_MAX_WORDS = 4
+ENGLISH_MIN_RATIO = 0.1
+ENGLISH_ACCENTED_MIN_RATIO = 0.3
+
+# Share of letters a non-Latin script needs to decide the language of mixed-script text
+SCRIPT_MIN_SHARE = 0.2
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+# Devanagari words including vowel signs, without the danda punctuation
+DEVANAGARI_WORD_PATTERN = re.compile(r"[\u0900-\u0963\u0966-\u097F]+")
+
+def script_of(char: str) -> str:
+    """Script of a letter: a SCRIPT_RANGES name, Latin or Other"""
+    code = ord(char)
+    if code < 0x250 and char.isalpha():
+        return "Latin"
+    for start, end, script in SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    return "Other"
+
+def script_counts(text: str) -> Dict[str, int]:
+    """Letters per script (combining vowel signs count toward their script)"""
+    counts = {}
+    for char in text:
+        if char.isalpha() or 0x0900 <= ord(char) <= 0x0DFF:
+            script = script_of(char)
+            counts[script] = counts.get(script, 0) + 1
+    return counts
+
+def is_hinglish(text: str) -> bool:
+    """Romanized Hindi: enough of the words are Hindi function words (one is enough in a short query)"""
+    words = [word.casefold() for word in WORD_PATTERN.findall(text)]
+    markers = sum(1 for word in words if word in HINGLISH_MARKERS)
+    if len(words) <= HINGLISH_SHORT_QUERY_WORDS:
+        return markers >= 1
+    return markers >= HINGLISH_MIN_WORDS and markers / len(words) >= HINGLISH_MIN_RATIO
+
+def is_english(text: str) -> bool:
+    """
+    Latin text reads as English: enough English function words, or a short keyword query without
+    accented letters. "Qu'est-ce que le piratage?" fails both and goes to the translator.
+    """
+    words = [word.casefold() for word in WORD_PATTERN.findall(text)]
+    if not words:
+        return True
+    accented = not all(word.isascii() for word in words)
+    markers = sum(1 for word in words if word in ENGLISH_MARKERS)
+    if markers / len(words) >= (ENGLISH_ACCENTED_MIN_RATIO if accented else ENGLISH_MIN_RATIO):
+        return True
+    return len(words) <= ENGLISH_KEYWORD_MAX_WORDS and not accented
+
+def detect_language(text: str) -> Dict[str, str]:
+    """
+    Language of a query: {"language", "script", "needs_translation"}.
+    Latin text is Hinglish, English, or Other (needs translation) when it fails the English check;
+    text without letters is English.
+    """
+    counts = script_counts(text or "")
+    letters = sum(counts.values())
+    native = {script: count for script, count in counts.items() if script != "Latin"}
+    
+    if native:
+        script = max(native, key=native.get)
+        if native[script] / letters >= SCRIPT_MIN_SHARE:
+            language = SCRIPT_LANGUAGES.get(script, "Other")
+            if script == "Devanagari" and MARATHI_MARKERS.intersection(DEVANAGARI_WORD_PATTERN.findall(text)):
+                language = "Marathi"
+            elif script == "Bengali" and ASSAMESE_LETTERS.intersection(text):
+                language = "Assamese"
+            return {"language": language, "script": script, "needs_translation": True}
+    
+    if counts.get("Latin") and is_hinglish(text):
+        return {"language": "Hinglish", "script": "Latin", "needs_translation": True}
+    if counts.get("Latin") and not is_english(text):
+        return {"language": "Other", "script": "Latin", "needs_translation": True}
+    return {"language": "English", "script": "Latin", "needs_translation": False}
+
+if __name__ == "__main__":
+    text = input("Enter text: ")
+    print(detect_language(text))
@@ -0,0 +1,39 @@
+"""
+Local Stand-in Embedder
+Deterministic feature-hashing embedder (word unigrams and bigrams) for running
+the retrieval pipeline offline and in tests without calling the embedding API.
+Vectors are not comparable with Gemini embeddings; index and queries must both use it.
+"""
+
+import hashlib
+import math
+import re
+from typing import List
+
+class LocalHashingEmbedder:
+    def __init__(self, dimensions: int = 768):
+        self.dimensions = dimensions
+        self.model_name = f"local-hashing-{dimensions}"
+        self.token_pattern = re.compile(r"\w+", re.UNICODE)
+    
+    def _features(self, text: str) -> List[str]:
+        tokens = self.token_pattern.findall(text.casefold())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    
+    def embed_text(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimensions
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        
+        norm = math.sqrt(sum(value * value for value in vector))
+        if norm == 0:
+            # Keep empty text embeddable so it never looks like a failed call
+            vector[0] = 1.0
+            return vector
+        return [value / norm for value in vector]
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_text(text) for text in texts]
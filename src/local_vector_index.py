@@ -0,0 +1,313 @@
+"""
+In-process Vector Index
+Mirrors the Weaviate collections as one contiguous float32 matrix per collection
+with L2-normalized rows, so a search is a single matrix-vector product plus an
+argpartition top-k. Distances are cosine distances, matching Weaviate's metric.
+
+With LOCAL_INDEX_DTYPE=float16 or int8 (per-row scale) every collection also gets a
+quantized copy that is scanned instead; the best limit * LOCAL_INDEX_RESCORE candidates
+are then rescored exactly against the float32 rows. For snapshot-backed collections the
+float32 matrix stays memory-mapped, so only the rescored rows are paged in; collections built
+in memory (from_records, from_weaviate) spill their float32 rows to an unlinked temporary file
+in LOCAL_INDEX_SPILL_DIR (default: the system temp directory) and map it the same way.
+"""
+
+import mmap
+import os
+import tempfile
+import time
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from knowledge_base import record_uuid
+from vector_snapshot import VectorSnapshot
+
+QUANTIZED_DTYPES = ("float32", "float16", "int8")
+
+# Rows dequantized per block when scanning a quantized matrix
+SCAN_BLOCK_ROWS = 16384
+
+class LocalVectorIndex:
+    def __init__(self, dtype: str = None, rescore_factor: int = None):
+        # collection name -> {"matrix": (n, d) float32, "ids": [...], "properties": [...],
+        #                     "quantized": (n, d) float16/int8 or None, "scales": (n,) float32 or None}
+        self.collections = {}
+        self.dtype = (dtype or os.getenv('LOCAL_INDEX_DTYPE', 'float32')).lower()
+        if self.dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f"Unknown LOCAL_INDEX_DTYPE {self.dtype!r}, expected one of {QUANTIZED_DTYPES}")
+        self.rescore_factor = rescore_factor or int(os.getenv('LOCAL_INDEX_RESCORE', '4'))
+    
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+    
+    @staticmethod
+    def quantize(matrix: np.ndarray, dtype: str):
+        """Quantized copy of a normalized float32 matrix and its per-row scales (None unless int8)"""
+        if dtype == "float16":
+            return np.asarray(matrix, dtype=np.float16), None
+        
+        quantized = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], SCAN_BLOCK_ROWS):
+            block = np.asarray(matrix[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1) / 127.0
+            block_scales[block_scales == 0] = 1.0
+            quantized[start:start + SCAN_BLOCK_ROWS] = np.round(block / block_scales[:, None])
+            scales[start:start + SCAN_BLOCK_ROWS] = block_scales
+        return quantized, scales
+    
+    @staticmethod
+    def _release_pages(matrix: np.ndarray):
+        """Drop a memory-mapped matrix's pages from resident memory after a full read"""
+        mapping = getattr(matrix, "_mmap", None)
+        if mapping is not None and hasattr(mapping, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+            try:
+                mapping.madvise(mmap.MADV_DONTNEED)
+            except (OSError, ValueError):
+                pass
+    
+    @staticmethod
+    def _spill(matrix: np.ndarray) -> Optional[np.memmap]:
+        """Copy an in-memory matrix to an unlinked temporary file and map it read-only, or None on failure"""
+        try:
+            with tempfile.TemporaryFile(dir=os.getenv('LOCAL_INDEX_SPILL_DIR') or None) as spill_file:
+                spilled = np.memmap(spill_file, dtype=np.float32, mode='w+', shape=matrix.shape)
+                spilled[:] = matrix
+                spilled.flush()
+            # The mapping keeps the file alive after it is closed
+            return spilled
+        except (OSError, ValueError) as e:
+            print(f"Could not spill float32 rows to disk: {e}")
+            return None
+    
+    def _set_collection(self, name: str, collection: Dict[str, Any], dtype: str = None):
+        """
+        Register a collection, building its quantized copy when the index dtype asks for one.
+        The float32 rows are then only kept for rescoring, memory-mapped so they do not stay resident.
+        """
+        dtype = dtype or self.dtype
+        collection["quantized"], collection["scales"] = None, None
+        matrix = collection["matrix"]
+        if dtype != "float32" and matrix.ndim == 2 and matrix.shape[0]:
+            collection["quantized"], collection["scales"] = self.quantize(matrix, dtype)
+            if not isinstance(matrix, np.memmap):
+                spilled = self._spill(matrix)
+                if spilled is not None:
+                    collection["matrix"] = matrix = spilled
+            self._release_pages(matrix)
+            
+            resident = self._resident_bytes(collection)
+            if resident >= matrix.nbytes:
+                print(f"Warning: {dtype} quantization of {name} saves no memory "
+                      f"({resident / 1024:.0f} KiB resident vs {matrix.nbytes / 1024:.0f} KiB float32)")
+        self.collections[name] = collection
+    
+    def add_collection(self, name: str, ids: List[str], vectors: List[List[float]], properties: List[Dict[str, Any]]):
+        """Replace a collection with the given objects"""
+        if not (len(ids) == len(vectors) == len(properties)):
+            raise ValueError(f"Collection {name}: ids, vectors and properties must have the same length")
+        
+        if vectors:
+            matrix = self._normalize_rows(np.asarray(vectors, dtype=np.float32))
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        
+        self._set_collection(name, {
+            "matrix": matrix,
+            "ids": list(ids),
+            "properties": list(properties)
+        })
+    
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indexes of the k highest scores, best first"""
+        k = min(k, scores.shape[0])
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        return top[np.argsort(-scores[top])]
+    
+    @staticmethod
+    def _approximate_scores(collection: Dict[str, Any], query: np.ndarray) -> np.ndarray:
+        """Cosine similarity against the quantized copy, dequantizing one block at a time"""
+        quantized, scales = collection["quantized"], collection["scales"]
+        scores = np.empty(quantized.shape[0], dtype=np.float32)
+        for start in range(0, quantized.shape[0], SCAN_BLOCK_ROWS):
+            scores[start:start + SCAN_BLOCK_ROWS] = quantized[start:start + SCAN_BLOCK_ROWS].astype(np.float32) @ query
+        if scales is not None:
+            scores *= scales
+        return scores
+    
+    def _search_indexes(self, collection: Dict[str, Any], query: np.ndarray, limit: int, rescore: bool = True):
+        """(row indexes, cosine similarities) of the nearest rows, best first"""
+        if collection["quantized"] is None:
+            scores = collection["matrix"] @ query
+            top = self._top_k(scores, limit)
+            return top, scores[top]
+        
+        scores = self._approximate_scores(collection, query)
+        if not rescore:
+            top = self._top_k(scores, limit)
+            return top, scores[top]
+        
+        # Exact float32 rescoring of the best candidates; sorted rows keep memory-mapped reads sequential
+        candidates = np.sort(self._top_k(scores, limit * self.rescore_factor))
+        exact = np.asarray(collection["matrix"][candidates], dtype=np.float32) @ query
+        order = self._top_k(exact, limit)
+        return candidates[order], exact[order]
+    
+    @staticmethod
+    def _normalize_query(query_vector: List[float]) -> Optional[np.ndarray]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        return query / norm if norm else None
+    
+    def search(self, name: str, query_vector: List[float], limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Return up to `limit` (id, properties, cosine distance) tuples, nearest first"""
+        collection = self.collections.get(name)
+        if collection is None or limit <= 0 or len(collection["ids"]) == 0:
+            return []
+        
+        query = self._normalize_query(query_vector)
+        if query is None:
+            return []
+        
+        top, scores = self._search_indexes(collection, query, limit)
+        return [
+            (collection["ids"][i], collection["properties"][i], float(1.0 - score))
+            for i, score in zip(top, scores)
+        ]
+    
+    def get(self, name: str, object_id: str) -> Optional[Dict[str, Any]]:
+        """Properties of one object by id, or None"""
+        collection = self.collections.get(name)
+        if collection is None:
+            return None
+        if "positions" not in collection:
+            collection["positions"] = {object_id: i for i, object_id in enumerate(collection["ids"])}
+        position = collection["positions"].get(object_id)
+        return collection["properties"][position] if position is not None else None
+    
+    @staticmethod
+    def _resident_bytes(collection: Dict[str, Any]) -> int:
+        """Vector memory held by the process: the quantized copy plus the float32 matrix unless it is memory-mapped"""
+        size = 0
+        if collection["quantized"] is not None:
+            size += collection["quantized"].nbytes + (collection["scales"].nbytes if collection["scales"] is not None else 0)
+        if collection["quantized"] is None or not isinstance(collection["matrix"], np.memmap):
+            size += collection["matrix"].nbytes
+        return int(size)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Object counts and matrix memory per collection"""
+        return {
+            name: {
+                "objects": len(collection["ids"]),
+                "dimensions": collection["matrix"].shape[1] if collection["matrix"].ndim == 2 else 0,
+                "dtype": self.dtype if collection["quantized"] is not None else "float32",
+                "bytes": int(collection["matrix"].nbytes),
+                "resident_bytes": self._resident_bytes(collection),
+                "memory_mapped": isinstance(collection["matrix"], np.memmap)
+            }
+            for name, collection in self.collections.items()
+        }
+    
+    def quantization_report(self, name: str, queries: List[List[float]] = None, limit: int = 10,
+                            sample: int = 200) -> Dict[str, Dict[str, float]]:
+        """
+        Recall@limit against exact float32 search, and vector bytes, for every dtype.
+        Queries default to a random sample of the collection's own rows.
+        """
+        collection = self.collections.get(name)
+        if collection is None or len(collection["ids"]) == 0:
+            return {}
+        
+        matrix = collection["matrix"]
+        if queries is None:
+            rows = np.random.default_rng(0).choice(matrix.shape[0], size=min(sample, matrix.shape[0]), replace=False)
+            query_matrix = np.asarray(matrix[np.sort(rows)], dtype=np.float32)
+        else:
+            query_matrix = np.asarray([query for query in (self._normalize_query(q) for q in queries) if query is not None])
+        
+        exact = [set(self._top_k(matrix @ query, limit).tolist()) for query in query_matrix]
+        report = {}
+        for dtype in QUANTIZED_DTYPES:
+            if dtype == "float32":
+                report[dtype] = {"bytes": int(matrix.nbytes), "recall": 1.0, "recall_rescored": 1.0}
+                continue
+            
+            quantized, scales = self.quantize(matrix, dtype)
+            trial = {"matrix": matrix, "quantized": quantized, "scales": scales}
+            recall = {True: 0.0, False: 0.0}
+            for query, expected in zip(query_matrix, exact):
+                for rescore in (False, True):
+                    top, _ = self._search_indexes(trial, query, limit, rescore)
+                    recall[rescore] += len(expected & set(top.tolist())) / len(expected)
+            report[dtype] = {
+                "bytes": int(quantized.nbytes + (scales.nbytes if scales is not None else 0)),
+                "recall": recall[False] / len(exact),
+                "recall_rescored": recall[True] / len(exact)
+            }
+        return report
+    
+    @classmethod
+    def from_weaviate(cls, client, collection_names: Dict[str, str]) -> "LocalVectorIndex":
+        """Mirror collections (properties and stored vectors) from Weaviate; collection_names maps logical to physical names"""
+        index = cls()
+        for name, physical_name in collection_names.items():
+            start = time.perf_counter()
+            ids, vectors, properties = [], [], []
+            for item in client.collections.get(physical_name).iterator(include_vector=True):
+                vector = item.vector.get("default") if isinstance(item.vector, dict) else item.vector
+                if not vector:
+                    continue
+                ids.append(str(item.uuid))
+                vectors.append(vector)
+                properties.append(dict(item.properties))
+            index.add_collection(name, ids, vectors, properties)
+            print(f"Mirrored {len(ids)} objects from {physical_name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return index
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: VectorSnapshot) -> "LocalVectorIndex":
+        """Memory-map every collection of a snapshot; rows are already normalized so nothing is copied"""
+        index = cls()
+        start = time.perf_counter()
+        for name in snapshot.manifest["collections"]:
+            index._set_collection(name, snapshot.load_collection(name))
+        print(f"Loaded snapshot {snapshot.version} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return index
+    
+    @classmethod
+    def from_records(cls, records_by_collection: Dict[str, List[Dict[str, Any]]],
+                     embed_fn: Callable[[List[str]], List[List[float]]]) -> "LocalVectorIndex":
+        """Build collections from knowledge base records, embedding their text with embed_fn"""
+        index = cls()
+        for name, records in records_by_collection.items():
+            vectors = embed_fn([record["text"] for record in records]) if records else []
+            index.add_collection(
+                name,
+                [record_uuid(name, record["key"]) for record in records],
+                vectors,
+                [record["properties"] for record in records]
+            )
+        return index
+
+if __name__ == "__main__":
+    # Recall-vs-memory report for the quantized dtypes, on the current snapshot or the offline stand-in embeddings
+    from knowledge_base import load_all_records
+    from local_embedder import LocalHashingEmbedder
+    
+    snapshot = VectorSnapshot.current(os.getenv('VECTOR_SNAPSHOT_PATH', 'CYBERLAW_CHATBOT/snapshots'))
+    if snapshot is not None:
+        index = LocalVectorIndex.from_snapshot(snapshot)
+    else:
+        index = LocalVectorIndex.from_records(load_all_records(), LocalHashingEmbedder().embed)
+    
+    for name in index.collections:
+        print(f"\n=== {name} ===")
+        for dtype, row in index.quantization_report(name).items():
+            print(f"{dtype:>8}: {row['bytes'] / 1024:8.1f} KiB  recall@10 {row['recall']:.3f}  rescored {row['recall_rescored']:.3f}")
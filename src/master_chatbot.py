@@ -14,6 +14,10 @@ from dotenv import load_dotenv
 from typing import Dict, List, Any
 import tempfile
 import re
+from embedding_cache import get_embedding_cache
+from index_registry import IndexRegistry
+from language_detector import detect_language
+from weaviate_connection import get_weaviate_manager
 
 load_dotenv()
 
@@ -31,6 +35,8 @@ class MasterCyberLawChatbot:
         
         # Initialize core components
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.embedding_model = f"models/{os.getenv('EMBEDDING_MODEL', 'text-embedding-004')}"
+        self.embedding_cache = get_embedding_cache()
         self.conversation_history = []
         self.max_history_turns = 6
         
@@ -38,11 +44,9 @@ class MasterCyberLawChatbot:
         self.active_complaint_id = None
         self.session_state = "general"  # general, complaint_collection, file_analysis
         
-        # Initialize Weaviate client
-        self.client = weaviate.connect_to_weaviate_cloud(
-            cluster_url=self.weaviate_url,
-            auth_credentials=weaviate.auth.AuthApiKey(self.weaviate_api_key)
-        )
+        # Shared, health-checked Weaviate client
+        self.connection = get_weaviate_manager()
+        self.index_registry = IndexRegistry(self.connection)
         
         # Initialize directories
         self.complaint_dir = "CYBERLAW_CHATBOT/complaints"
@@ -59,6 +63,10 @@ class MasterCyberLawChatbot:
         
         print("🤖 Master Cyber Law Chatbot initialized successfully!")
     
+    @property
+    def client(self):
+        return self.connection.client()
+    
     def ensure_directories(self):
         """Create necessary directories"""
         if not os.path.exists(self.complaint_dir):
@@ -204,7 +212,11 @@ class MasterCyberLawChatbot:
     # ===========================================
     
     def detect_language_and_translate(self, text: str) -> Dict[str, str]:
-        """Detect language and translate to English if needed"""
+        """Detect language locally and translate to English if needed (English skips the model call)"""
+        detected = detect_language(text)
+        if not detected["needs_translation"]:
+            return {"original_language": "English", "translated_text": text}
+        
         try:
             detection_prompt = f"""
             Detect the language of this text and translate it to English if it's not already in English.
@@ -225,35 +237,41 @@ class MasterCyberLawChatbot:
             if response and response.text:
                 try:
                     result = json.loads(response.text.strip())
+                    # The script tells Hindi from Tamil reliably; the model only names scripts we do not know
+                    language = detected["language"] if detected["language"] != "Other" else result.get("original_language", "Other")
                     return {
-                        "original_language": result.get("original_language", "English"),
+                        "original_language": language,
                         "translated_text": result.get("translated_text", text)
                     }
                 except json.JSONDecodeError:
                     pass
             
-            return {"original_language": "English", "translated_text": text}
+            return {"original_language": detected["language"], "translated_text": text}
             
         except Exception as e:
             print(f"Translation error: {e}")
-            return {"original_language": "English", "translated_text": text}
+            return {"original_language": detected["language"], "translated_text": text}
     
     # ===========================================
     # VECTOR SEARCH MODULE
     # ===========================================
     
-    def generate_query_embedding(self, query: str) -> List[float]:
-        """Generate embedding for search query"""
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Call the embedding API for a batch of queries (no caching)"""
         try:
             result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=query,
+                model=self.embedding_model,
+                content=list(queries),
                 task_type="retrieval_query"
             )
             return result['embedding']
         except Exception as e:
             print(f"Embedding error: {e}")
-            return []
+            return [[] for _ in queries]
+    
+    def generate_query_embedding(self, query: str) -> List[float]:
+        """Generate embedding for search query"""
+        return self.embedding_cache.get_or_embed([query], self.embedding_model, "retrieval_query", self.embed_queries)[0]
     
     def search_cyberlaw(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Search legal sections"""
@@ -262,7 +280,7 @@ class MasterCyberLawChatbot:
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("CyberLaw")
+            collection = self.client.collections.get(self.index_registry.collection_name("CyberLaw"))
             response = collection.query.near_vector(
                 near_vector=query_vector,
                 limit=limit,
@@ -294,7 +312,7 @@ class MasterCyberLawChatbot:
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("FAQ")
+            collection = self.client.collections.get(self.index_registry.collection_name("FAQ"))
             response = collection.query.near_vector(
                 near_vector=query_vector,
                 limit=limit,
@@ -322,7 +340,7 @@ class MasterCyberLawChatbot:
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("NodalOfficer")
+            collection = self.client.collections.get(self.index_registry.collection_name("NodalOfficer"))
             response = collection.query.near_vector(
                 near_vector=query_vector,
                 limit=limit,
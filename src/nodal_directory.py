@@ -0,0 +1,159 @@
+"""
+Nodal Officer Directory
+In-memory index of nodal_officers.json keyed by state/UT. Queries are matched against the
+official names plus aliases, former names, major cities, abbreviations and close misspellings,
+so a location in the query resolves to its officer without an embedding or vector query.
+"""
+
+import difflib
+import os
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+from knowledge_base import KNOWLEDGE_BASE_PATH, KNOWLEDGE_BASE_SOURCES, load_records, record_uuid
+
+# state_ut as written in nodal_officers.json -> other ways users name it
+STATE_ALIASES = {
+    "ANDAMAN & NICOBAR": ["andaman and nicobar islands", "andaman", "nicobar", "port blair"],
+    "ANDHRA PRADESH": ["andhra", "amaravati", "visakhapatnam", "vizag", "vijayawada"],
+    "ARUNACHAL PRADESH": ["arunachal", "itanagar"],
+    "ASSAM": ["guwahati", "dispur"],
+    "BIHAR": ["patna"],
+    "CHANDIGARH": [],
+    "CHHATTISGARH": ["chattisgarh", "chhatisgarh", "raipur"],
+    "DADRA & NAGAR HAVELI AND DAMAN & DIU": ["dadra and nagar haveli", "dadra", "nagar haveli", "daman", "diu", "silvassa"],
+    "DELHI": ["new delhi", "nct of delhi", "ncr"],
+    "GOA": ["panaji", "panjim"],
+    "GUJARAT": ["gujrat", "ahmedabad", "gandhinagar", "surat", "vadodara"],
+    "HARYANA": ["gurgaon", "gurugram", "faridabad"],
+    "HIMACHAL PRADESH": ["himachal", "shimla"],
+    "JAMMU & KASHMIR": ["jammu and kashmir", "jammu", "kashmir", "srinagar"],
+    "JHARKHAND": ["ranchi"],
+    "KARNATAKA": ["bangalore", "bengaluru", "mysore", "mysuru"],
+    "KERALA": ["thiruvananthapuram", "trivandrum", "kochi", "cochin"],
+    "LADAKH": ["leh", "kargil"],
+    "LAKSHADWEEP": ["kavaratti"],
+    "MADHYA PRADESH": ["bhopal", "indore"],
+    "MAHARASHTRA": ["maharastra", "mumbai", "bombay", "pune", "nagpur"],
+    "MANIPUR": ["imphal"],
+    "MEGHALAYA": ["shillong"],
+    "MIZORAM": ["aizawl"],
+    "NAGALAND": ["kohima"],
+    "ODISHA": ["orissa", "bhubaneswar"],
+    "PUDUCHERRY": ["pondicherry", "pondy"],
+    "PUNJAB": ["ludhiana", "amritsar"],
+    "RAJASTHAN": ["jaipur", "jodhpur", "udaipur"],
+    "SIKKIM": ["gangtok"],
+    "TAMIL NADU": ["tamilnadu", "chennai", "madras", "coimbatore", "madurai"],
+    "TELANGANA": ["hyderabad", "secunderabad"],
+    "TRIPURA": ["agartala"],
+    "UTTARAKHAND": ["uttaranchal", "dehradun"],
+    "UTTAR PRADESH": ["lucknow", "noida", "kanpur", "varanasi", "ghaziabad"],
+    "WEST BENGAL": ["bengal", "kolkata", "calcutta"]
+}
+
+# Abbreviations are ordinary words in lower case ("up", "hp"), so they only match as written
+STATE_ABBREVIATIONS = {
+    "A&N": "ANDAMAN & NICOBAR",
+    "AP": "ANDHRA PRADESH",
+    "CG": "CHHATTISGARH",
+    "DNH": "DADRA & NAGAR HAVELI AND DAMAN & DIU",
+    "HP": "HIMACHAL PRADESH",
+    "J&K": "JAMMU & KASHMIR",
+    "JK": "JAMMU & KASHMIR",
+    "MP": "MADHYA PRADESH",
+    "TN": "TAMIL NADU",
+    "UP": "UTTAR PRADESH",
+    "WB": "WEST BENGAL"
+}
+
+# Misspellings are only matched for names at least this long, at this similarity
+FUZZY_MIN_LENGTH = 5
+FUZZY_CUTOFF = 0.85
+
+class NodalDirectory:
+    def __init__(self, officers: Dict[str, Dict[str, Any]]):
+        # state_ut -> {"id": object id, "properties": {...}}
+        self.officers = officers
+        
+        # normalized name or alias -> state_ut
+        self.names = {}
+        for state in officers:
+            self.names[self.normalize(state)] = state
+            for alias in STATE_ALIASES.get(state, []):
+                self.names.setdefault(self.normalize(alias), state)
+        self.max_name_words = max((len(name.split()) for name in self.names), default=0)
+        
+        # Fuzzy candidates grouped by word count, so "and daman" cannot pass for "andaman"
+        self.fuzzy_names = {}
+        for name in self.names:
+            if len(name) >= FUZZY_MIN_LENGTH:
+                self.fuzzy_names.setdefault(len(name.split()), []).append(name)
+        
+        abbreviations = sorted((abbr for abbr, state in STATE_ABBREVIATIONS.items() if state in officers), key=len, reverse=True)
+        self.abbreviation_pattern = re.compile(
+            rf"(?<![A-Za-z&])(?:{'|'.join(re.escape(abbr) for abbr in abbreviations)})(?![A-Za-z&])"
+        ) if abbreviations else None
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case-fold, spell out '&' and drop punctuation"""
+        text = unicodedata.normalize('NFKC', text).casefold().replace("&", " and ")
+        return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+    
+    def _match_name(self, name: str) -> Optional[str]:
+        state = self.names.get(name)
+        if state is None and len(name) >= FUZZY_MIN_LENGTH:
+            candidates = self.fuzzy_names.get(len(name.split()), [])
+            close = difflib.get_close_matches(name, candidates, n=1, cutoff=FUZZY_CUTOFF)
+            if close:
+                state = self.names[close[0]]
+        return state
+    
+    def locate(self, query: str) -> List[str]:
+        """States/UTs named in the query, in order of appearance (abbreviations after full names)"""
+        states = []
+        words = self.normalize(query).split()
+        position = 0
+        while position < len(words):
+            # Longest name first, so "west bengal" wins over "bengal"
+            for size in range(min(self.max_name_words, len(words) - position), 0, -1):
+                state = self._match_name(" ".join(words[position:position + size]))
+                if state is not None:
+                    if state not in states:
+                        states.append(state)
+                    position += size
+                    break
+            else:
+                position += 1
+        
+        if self.abbreviation_pattern is not None:
+            for match in self.abbreviation_pattern.finditer(query):
+                state = STATE_ABBREVIATIONS[match.group(0)]
+                if state not in states:
+                    states.append(state)
+        return states
+    
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Officer record for a state/UT name, alias, abbreviation or near-miss spelling"""
+        state = STATE_ABBREVIATIONS.get(name.strip().upper()) or self._match_name(self.normalize(name))
+        return self.officers.get(state) if state else None
+    
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Officer records for every state/UT mentioned in the query: [{"id", "properties"}]"""
+        return [self.officers[state] for state in self.locate(query)]
+    
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base_path: str = KNOWLEDGE_BASE_PATH) -> "NodalDirectory":
+        """Index nodal_officers.json by state/UT"""
+        officers = {}
+        for filename, collection_name, items_key, record_builder in KNOWLEDGE_BASE_SOURCES:
+            file_path = os.path.join(knowledge_base_path, filename)
+            if collection_name != "NodalOfficer" or not os.path.exists(file_path):
+                continue
+            for record in load_records(file_path, items_key, record_builder):
+                officers[record["properties"]["state"]] = {
+                    "id": record_uuid(collection_name, record["key"]),
+                    "properties": record["properties"]
+                }
+        return cls(officers)
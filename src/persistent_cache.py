@@ -0,0 +1,146 @@
+"""
+Persistent LRU Cache
+Bounded in-memory LRU backed by a SQLite table on disk, so entries survive restarts.
+Every put is written through to disk; entries evicted from memory are still served
+from disk and promoted back into memory on the next hit.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class PersistentLRUCache:
+    def __init__(self, db_path: str, table: str = "cache", max_entries: int = 2048, max_disk_entries: int = 100000):
+        self.db_path = db_path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self.puts_since_trim = 0
+        
+        self.connection = None
+        try:
+            directory = os.path.dirname(db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self.connection = sqlite3.connect(db_path, check_same_thread=False)
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value BLOB, accessed REAL)"
+            )
+            self.connection.commit()
+        except Exception as e:
+            # Fall back to a memory-only cache rather than failing the caller
+            print(f"Error opening cache database {db_path}: {e}")
+            self.connection = None
+    
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value for the disk tier"""
+        return json.dumps(value, ensure_ascii=False).encode('utf-8')
+    
+    def decode(self, data: bytes) -> Any:
+        """Deserialize a value read from the disk tier"""
+        return json.loads(data.decode('utf-8') if isinstance(data, bytes) else data)
+    
+    def _remember(self, key: str, value: Any):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats_counters["evictions"] += 1
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None"""
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats_counters["memory_hits"] += 1
+                return self.memory[key]
+            
+            if self.connection is not None:
+                try:
+                    row = self.connection.execute(
+                        f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        value = self.decode(row[0])
+                        self.connection.execute(
+                            f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (time.time(), key)
+                        )
+                        self.connection.commit()
+                        self._remember(key, value)
+                        self.stats_counters["disk_hits"] += 1
+                        return value
+                except Exception as e:
+                    print(f"Error reading cache entry: {e}")
+            
+            self.stats_counters["misses"] += 1
+            return None
+    
+    def put(self, key: str, value: Any):
+        """Store a value in memory and write it through to disk"""
+        with self.lock:
+            self._remember(key, value)
+            self.stats_counters["writes"] += 1
+            
+            if self.connection is None:
+                return
+            try:
+                self.connection.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, accessed) VALUES (?, ?, ?)",
+                    (key, self.encode(value), time.time())
+                )
+                self.connection.commit()
+                
+                self.puts_since_trim += 1
+                if self.puts_since_trim >= 1000:
+                    self.puts_since_trim = 0
+                    self._trim_disk()
+            except Exception as e:
+                print(f"Error writing cache entry: {e}")
+    
+    def _trim_disk(self):
+        """Drop the least recently accessed disk entries beyond max_disk_entries"""
+        count = self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self.connection.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                (excess,)
+            )
+            self.connection.commit()
+    
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self.lock:
+            self.memory.clear()
+            if self.connection is not None:
+                self.connection.execute(f"DELETE FROM {self.table}")
+                self.connection.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self.lock:
+            stats = dict(self.stats_counters)
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            lookups = hits + stats["misses"]
+            stats["hit_rate"] = hits / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self.memory)
+            stats["max_entries"] = self.max_entries
+            if self.connection is not None:
+                stats["disk_entries"] = self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+            return stats
+    
+    def close(self):
+        """Close the disk tier"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,170 @@
+"""
+Query Pipeline Benchmark
+Compares the translate pipeline (translate, then retrieve with the English text) with the direct
+pipeline (retrieve with the original text, QUERY_PIPELINE=direct) on non-English queries: latency
+up to the answer call and overlap of the retrieved results. Both go through the chatbot service's
+understand_query and retrieve, so section resolution, the nodal directory, expansions and BM25 run
+as they do in production (native-script queries only give them their Latin keywords in direct mode).
+
+By default it runs offline with the local stand-in models: the hashing embedder over the local
+index, and a translator that returns the reference English after --translation-latency seconds.
+The hashing embedder is not multilingual, so offline overlap for native-script queries is a
+lower bound; --live uses GeminiTranslationModule and the EMBEDDING_MODEL / VECTOR_BACKEND
+configuration (run it against a gemini-embedding-001 index for the real comparison).
+
+Usage (from the repository root): python src/query_pipeline_benchmark.py [--live] [--queries queries.json] [--translation-latency 0.6]
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+# Non-English queries with a reference English translation
+BENCHMARK_QUERIES = [
+    {"query": "मेरे बैंक खाते से UPI धोखाधड़ी से पैसे निकाल लिए गए, मैं क्या करूं?",
+     "english": "Money was withdrawn from my bank account through UPI fraud, what should I do?"},
+    {"query": "किसी ने मेरा सोशल मीडिया अकाउंट हैक कर लिया है",
+     "english": "Someone has hacked my social media account"},
+    {"query": "बिना अनुमति के किसी की निजी तस्वीरें ऑनलाइन डालने की सज़ा क्या है?",
+     "english": "What is the punishment for posting someone's private photos online without consent?"},
+    {"query": "माझे ईमेल खाते हॅक झाले आहे, तक्रार कशी करावी?",
+     "english": "My email account has been hacked, how do I file a complaint?"},
+    {"query": "ஆன்லைன் மோசடிக்கு என்ன தண்டனை?",
+     "english": "What is the punishment for online fraud?"},
+    {"query": "আমার পরিচয় চুরি করে কেউ ভুয়া প্রোফাইল বানিয়েছে",
+     "english": "Someone stole my identity and created a fake profile"},
+    {"query": "mera account hack ho gaya hai, mujhe kya karna chahiye?",
+     "english": "My account has been hacked, what should I do?"},
+    {"query": "UPI fraud ki complaint kaise kare aur kitni saza hoti hai?",
+     "english": "How do I file a UPI fraud complaint and what is the punishment?"},
+    {"query": "koi mujhe online blackmail kar raha hai photos ke saath",
+     "english": "Someone is blackmailing me online with photos"},
+    {"query": "Delhi mein cyber crime ki shikayat kahan karein?",
+     "english": "Where do I file a cyber crime complaint in Delhi?"}
+]
+
+CATEGORIES = ("cyberlaw", "faq", "nodal_officers")
+
+class StandInTranslator:
+    """Reference translations after a fixed delay, in place of the translation model call"""
+    
+    def __init__(self, references: Dict[str, str], latency: float):
+        self.references = references
+        self.latency = latency
+    
+    def translate_to_english(self, text: str) -> str:
+        time.sleep(self.latency)
+        return self.references.get(text, text)
+    
+    def detect_language_and_translate(self, text: str) -> Dict[str, str]:
+        """Same contract as GeminiTranslationModule.detect_language_and_translate"""
+        from language_detector import detect_language
+        detected = detect_language(text)
+        if not detected["needs_translation"]:
+            return {"original_language": "English", "translated_text": text}
+        return {"original_language": detected["language"], "translated_text": self.translate_to_english(text)}
+
+def live_translator():
+    """GeminiTranslationModule without its cache, so every query pays for the model call"""
+    from gemini_translator import GeminiTranslationModule
+    
+    class LiveTranslator(GeminiTranslationModule):
+        def translate_to_english(self, text: str) -> str:
+            try:
+                response = self.model.generate_content(self.build_prompt(text))
+                return self.clean_translation(response, text)
+            except Exception as e:
+                print(f"Translation error: {e}")
+                return text
+    
+    return LiveTranslator()
+
+def result_ids(search_results: Dict[str, Any]) -> Dict[str, List[str]]:
+    return {category: [result["id"] for result in search_results.get(category, [])] for category in CATEGORIES}
+
+def overlap(first: List[str], second: List[str]) -> float:
+    """Jaccard overlap of two result lists (1.0 when both are empty)"""
+    if not first and not second:
+        return 1.0
+    return len(set(first) & set(second)) / len(set(first) | set(second))
+
+def timed_retrieve(service, query: str, pipeline: str) -> Dict[str, Any]:
+    """understand_query and retrieve under one pipeline, as the service runs them before the answer call"""
+    service.query_pipeline = pipeline
+    # Every run pays for retrieval; the retrieval cache would otherwise answer repeats
+    service.searcher.retrieval_cache.clear()
+    start = time.perf_counter()
+    understanding = service.understand_query(query)
+    results = service.retrieve(understanding["translated_text"])
+    return {"results": results, "ms": (time.perf_counter() - start) * 1000}
+
+def run_benchmark(service, queries: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    rows = []
+    for item in queries:
+        query = item["query"]
+        translated = timed_retrieve(service, query, "translate")
+        direct = timed_retrieve(service, query, "direct")
+        
+        translated_ids = result_ids(translated["results"])
+        direct_ids = result_ids(direct["results"])
+        rows.append({
+            "query": query,
+            "translate_ms": translated["ms"],
+            "direct_ms": direct["ms"],
+            "overlap": {category: overlap(translated_ids[category], direct_ids[category]) for category in CATEGORIES},
+            "top_section_match": translated_ids["cyberlaw"][:1] == direct_ids["cyberlaw"][:1]
+        })
+    return rows
+
+def print_report(rows: List[Dict[str, Any]]):
+    print(f"\n{'query':<42} {'translate ms':>12} {'direct ms':>10} {'cyberlaw':>9} {'faq':>6} {'officers':>9}")
+    for row in rows:
+        label = row["query"] if len(row["query"]) <= 40 else row["query"][:39] + "…"
+        print(f"{label:<42} {row['translate_ms']:>12.1f} {row['direct_ms']:>10.1f} "
+              f"{row['overlap']['cyberlaw']:>9.2f} {row['overlap']['faq']:>6.2f} {row['overlap']['nodal_officers']:>9.2f}")
+    
+    count = len(rows)
+    translate_ms = sum(row["translate_ms"] for row in rows) / count
+    direct_ms = sum(row["direct_ms"] for row in rows) / count
+    print(f"\nMean latency before the answer call: translate {translate_ms:.1f} ms, direct {direct_ms:.1f} ms "
+          f"({translate_ms - direct_ms:.1f} ms and one model call saved per query)")
+    for category in CATEGORIES:
+        print(f"Mean {category} overlap: {sum(row['overlap'][category] for row in rows) / count:.2f}")
+    print(f"Same top section: {sum(row['top_section_match'] for row in rows)}/{count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate vs direct query pipeline benchmark")
+    parser.add_argument("--live", action="store_true", help="Use the Gemini translator and the configured embedding/vector backends")
+    parser.add_argument("--queries", help="JSON file of [{\"query\", \"english\"}]")
+    parser.add_argument("--translation-latency", type=float, default=0.6, help="Stand-in translation delay in seconds (offline)")
+    args = parser.parse_args()
+    
+    queries = BENCHMARK_QUERIES
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = json.load(f)
+    
+    if not args.live:
+        os.environ['VECTOR_BACKEND'] = 'local'
+        os.environ['EMBEDDING_BACKEND'] = 'local'
+        # The service configures Gemini at start-up; offline runs never call it
+        os.environ.setdefault('GOOGLE_API_KEY', 'offline-benchmark')
+    
+    from chatbot_service import CyberLawChatbotService
+    service = CyberLawChatbotService()
+    try:
+        if args.live:
+            service.translator = live_translator()
+        else:
+            service.translator = StandInTranslator({item["query"]: item["english"] for item in queries}, args.translation_latency)
+        searcher = service.searcher
+        # Both pipelines are timed regardless of QUERY_PIPELINE, even with an English-only embedding model
+        print(f"Embedding model: {searcher.embedding_model} (multilingual: {searcher.multilingual_embeddings})")
+        print_report(run_benchmark(service, queries))
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
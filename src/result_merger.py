@@ -0,0 +1,80 @@
+"""
+Result Merger
+Combines per-category result lists from several sub-queries (the user's query plus its
+expansions) into one ranked, truncated list per category. Results are keyed by object id and
+fused with reciprocal rank fusion or by keeping each object's smallest distance.
+"""
+
+import copy
+import os
+from typing import Any, Dict, List
+
+CATEGORIES = ["cyberlaw", "faq", "nodal_officers"]
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Stable identity of a result: its object id, or its identifying fields for results without one"""
+    if result.get("id"):
+        return result["id"]
+    return "|".join(str(result.get(field, '')) for field in ("law_type", "section_number", "title", "question", "state"))
+
+class ResultMerger:
+    STRATEGIES = ("rrf", "min_distance")
+    
+    def __init__(self, strategy: str = None, rrf_k: int = 60):
+        self.strategy = (strategy or os.getenv('RESULT_MERGE_STRATEGY', 'rrf')).lower()
+        if self.strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown merge strategy {self.strategy!r}, expected one of {self.STRATEGIES}")
+        self.rrf_k = rrf_k
+    
+    @staticmethod
+    def _distance(result: Dict[str, Any]) -> float:
+        return result["distance"] if result.get("distance") is not None else float('inf')
+    
+    def merge_category(self, result_lists: List[List[Dict[str, Any]]], limit: int = None,
+                       weights: List[float] = None) -> List[Dict[str, Any]]:
+        """Fuse several ranked lists for one category; exact section matches always come first"""
+        weights = weights or [1.0] * len(result_lists)
+        merged = {}
+        for results, weight in zip(result_lists, weights):
+            for rank, result in enumerate(results, start=1):
+                key = result_key(result)
+                best = merged.get(key)
+                if self.strategy == "rrf":
+                    score = weight / (self.rrf_k + rank)
+                    if best is None:
+                        # copy.copy keeps SearchResult's lazy property loading
+                        merged[key] = copy.copy(result)
+                        merged[key]["score"] = score
+                    else:
+                        best["score"] += score
+                        if self._distance(result) < self._distance(best):
+                            best["distance"] = result["distance"]
+                        if result.get("exact_match"):
+                            best["exact_match"] = True
+                elif best is None or self._distance(result) < self._distance(best):
+                    merged[key] = result
+        
+        if self.strategy == "rrf":
+            ranked = sorted(merged.values(), key=lambda r: (not r.get("exact_match"), -r["score"]))
+        else:
+            ranked = sorted(merged.values(), key=lambda r: (not r.get("exact_match"), self._distance(r)))
+        
+        if limit is not None:
+            ranked = ranked[:max(limit, sum(1 for r in ranked if r.get("exact_match")))]
+        return ranked
+    
+    def merge(self, result_sets: List[Dict[str, Any]], limits: Dict[str, int] = None,
+              weights: List[float] = None) -> Dict[str, Any]:
+        """
+        Merge search result dicts ({category: [results]}) from several sub-queries.
+        Returns the top `limits[category]` results per category (all of them if limits is None).
+        """
+        categories = [category for category in CATEGORIES if any(category in results for results in result_sets)]
+        return {
+            category: self.merge_category(
+                [results.get(category, []) for results in result_sets],
+                limits.get(category) if limits else None,
+                weights
+            )
+            for category in categories
+        }
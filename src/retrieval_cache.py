@@ -0,0 +1,117 @@
+"""
+Retrieval Result Cache
+Bounded TTL + LRU cache for search results, keyed by normalized query, result limits and the
+corpus version stamp. Every ingest writes a new stamp to the index pointer, so entries from an
+older corpus are never served; the first lookup under a new stamp drops them all.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from embedding_cache import EmbeddingCache
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of nested dicts/lists/strings"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(key) + estimate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+def copy_results(value: Any) -> Any:
+    """Copy the containers of a result structure so callers can mutate it; result objects are shared"""
+    if type(value) is dict:
+        return {key: copy_results(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_results(item) for item in value]
+    return value
+
+class RetrievalCache:
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('RETRIEVAL_CACHE_SIZE', '512'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('RETRIEVAL_CACHE_TTL', '600'))
+        
+        self.entries = OrderedDict()  # key -> (stored_at, size, results)
+        self.lock = threading.Lock()
+        self.corpus_version = None
+        self.memory_bytes = 0
+        self.stats_counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    @staticmethod
+    def make_key(kind: str, queries: List[str], limits: Dict[str, int], corpus_version: str) -> Tuple:
+        """Cache key for one search call"""
+        normalized = tuple(EmbeddingCache.normalize_text(query) for query in queries)
+        return (corpus_version, kind, normalized, tuple(sorted(limits.items())))
+    
+    def _drop(self, key: Tuple):
+        _, size, _ = self.entries.pop(key)
+        self.memory_bytes -= size
+    
+    def _check_version(self, corpus_version: str):
+        """Forget everything cached under an older corpus"""
+        if corpus_version != self.corpus_version:
+            if self.entries:
+                self.stats_counters["invalidations"] += len(self.entries)
+                self.entries.clear()
+                self.memory_bytes = 0
+            self.corpus_version = corpus_version
+    
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """A copy of the cached results, or None"""
+        if not self.enabled:
+            return None
+        with self.lock:
+            self._check_version(key[0])
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats_counters["misses"] += 1
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                self._drop(key)
+                self.stats_counters["expired"] += 1
+                self.stats_counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats_counters["hits"] += 1
+            return copy_results(entry[2])
+    
+    def put(self, key: Tuple, results: Dict[str, Any]):
+        """Store a copy of the results (without timings) and evict least recently used entries"""
+        if not self.enabled:
+            return
+        stored = copy_results({name: value for name, value in results.items() if name != "timings"})
+        size = estimate_size(stored)
+        with self.lock:
+            self._check_version(key[0])
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (time.monotonic(), size, stored)
+            self.memory_bytes += size
+            while len(self.entries) > self.max_entries:
+                self._drop(next(iter(self.entries)))
+                self.stats_counters["evictions"] += 1
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.memory_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, entry count and approximate memory footprint"""
+        with self.lock:
+            stats = dict(self.stats_counters)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self.entries)
+            stats["max_entries"] = self.max_entries
+            stats["memory_bytes"] = self.memory_bytes
+            stats["corpus_version"] = self.corpus_version
+            return stats
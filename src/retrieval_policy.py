@@ -0,0 +1,95 @@
+"""
+Adaptive Retrieval Policy
+Decides how many retrieved results per category actually reach the prompt. Results farther from
+the query than max_distance are dropped, as is everything past the first jump of more than max_gap
+between consecutive distances; min_k results are always kept and never more than max_k.
+Exact matches (named sections, directory officers) are always kept.
+Policies are per endpoint and can be overridden with the RETRIEVAL_POLICIES env var (JSON).
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+# endpoint -> category -> settings; max_distance / max_gap of None disable that cutoff
+RETRIEVAL_POLICIES = {
+    "chat": {
+        "cyberlaw": {"min_k": 3, "max_k": 10, "max_distance": 0.6, "max_gap": 0.08},
+        "faq": {"min_k": 1, "max_k": 5, "max_distance": 0.55, "max_gap": 0.08},
+        "nodal_officers": {"min_k": 1, "max_k": 3, "max_distance": 0.6, "max_gap": 0.05}
+    },
+    "checklist": {
+        "cyberlaw": {"min_k": 2, "max_k": 6, "max_distance": 0.6, "max_gap": 0.08},
+        "faq": {"min_k": 1, "max_k": 4, "max_distance": 0.55, "max_gap": 0.08},
+        "nodal_officers": {"min_k": 0, "max_k": 2, "max_distance": 0.5, "max_gap": 0.05}
+    },
+    "file_analysis": {
+        "cyberlaw": {"min_k": 2, "max_k": 8, "max_distance": 0.6, "max_gap": 0.08},
+        "faq": {"min_k": 1, "max_k": 3, "max_distance": 0.55, "max_gap": 0.08},
+        "nodal_officers": {"min_k": 0, "max_k": 2, "max_distance": 0.5, "max_gap": 0.05}
+    }
+}
+
+class RetrievalPolicy:
+    def __init__(self, name: str, settings: Dict[str, Dict[str, Any]]):
+        self.name = name
+        self.settings = settings
+    
+    @staticmethod
+    def distance_cutoff(distances: List[float], max_distance: float = None, max_gap: float = None) -> float:
+        """Largest distance kept: max_distance, lowered to just before the first jump of more than max_gap"""
+        cutoff = max_distance if max_distance is not None else float('inf')
+        if max_gap is not None:
+            ordered = sorted(distance for distance in distances if distance <= cutoff)
+            for previous, distance in zip(ordered, ordered[1:]):
+                if distance - previous > max_gap:
+                    return previous
+        return cutoff
+    
+    def prune_category(self, category: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ranked results within the distance cutoff, bounded by min_k and max_k"""
+        settings = self.settings.get(category)
+        if not settings:
+            return results
+        
+        exact = [result for result in results if result.get("exact_match")]
+        ranked = [result for result in results if not result.get("exact_match")]
+        max_k = max(settings.get("max_k", len(ranked)) - len(exact), 0)
+        min_k = min(settings.get("min_k", 0), max_k)
+        # The cutoff comes from the sorted distances, so it also works for rank-fused lists
+        cutoff = self.distance_cutoff(
+            [result["distance"] for result in ranked if result.get("distance") is not None],
+            settings.get("max_distance"), settings.get("max_gap")
+        )
+        
+        kept = []
+        for result in ranked:
+            if len(kept) >= max_k:
+                break
+            distance = result.get("distance")
+            # Results without a distance (BM25-only hybrid hits) are only bounded by max_k
+            if len(kept) < min_k or distance is None or distance <= cutoff:
+                kept.append(result)
+        return exact + kept
+    
+    def apply(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Prune every category in place and log how many results were dropped"""
+        pruned = {}
+        for category in self.settings:
+            if category in results:
+                kept = self.prune_category(category, results[category])
+                pruned[category] = len(results[category]) - len(kept)
+                results[category] = kept
+        
+        if any(pruned.values()):
+            print(f"Retrieval policy '{self.name}' pruned " + ", ".join(f"{count} {category}" for category, count in pruned.items()))
+        return results
+
+def load_policies() -> Dict[str, RetrievalPolicy]:
+    """Built-in policies with RETRIEVAL_POLICIES overrides: {"chat": {"faq": {"max_k": 3}}}"""
+    policies = {name: {category: dict(settings) for category, settings in categories.items()}
+                for name, categories in RETRIEVAL_POLICIES.items()}
+    for name, categories in json.loads(os.getenv('RETRIEVAL_POLICIES', '{}')).items():
+        for category, overrides in categories.items():
+            policies.setdefault(name, {}).setdefault(category, {}).update(overrides)
+    return {name: RetrievalPolicy(name, settings) for name, settings in policies.items()}
@@ -0,0 +1,69 @@
+"""
+Direct Section Resolver
+Spots law-qualified section references in a query ("IT Act 66E", "BNS 78", "section 420 IPC",
+"sections 66C and 66D of the IT Act") and looks them up in an in-memory index built from the
+statute files, so named provisions reach the context without an embedding or vector query.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Tuple
+from knowledge_base import KNOWLEDGE_BASE_PATH, KNOWLEDGE_BASE_SOURCES, load_records, record_uuid
+
+# law_type -> ways the law is written in queries
+LAW_ALIASES = {
+    "IT_ACT": [r"information\s+technology\s+act", r"it\s+act", r"it-act", r"ita"],
+    "BNS": [r"bharatiya\s+nyaya\s+sanhita", r"bns"],
+    "IPC": [r"indian\s+penal\s+code", r"ipc"]
+}
+
+SECTION_WORD = r"(?:sections?|secs?\.?|s\.|u/s\.?|§)"
+SECTION_NUMBER = r"\d{1,3}[a-z]{0,2}\b"
+SECTION_LIST = rf"{SECTION_NUMBER}(?:\s*(?:,|/|&|and|or)\s*{SECTION_NUMBER})*"
+
+class SectionResolver:
+    def __init__(self, sections: Dict[Tuple[str, str], Dict[str, Any]]):
+        # (law_type, section_number upper-cased) -> {"id": object id, "properties": {...}}
+        self.sections = sections
+        
+        law_before = "|".join(rf"(?P<before_{law_type}>{'|'.join(aliases)})" for law_type, aliases in LAW_ALIASES.items())
+        law_after = "|".join(rf"(?P<after_{law_type}>{'|'.join(aliases)})" for law_type, aliases in LAW_ALIASES.items())
+        self.pattern = re.compile(
+            rf"\b(?:(?:{law_before})(?:\s*,?\s*(?:19|20)\d\d\b)?\s*,?\s*(?:{SECTION_WORD}\s*)?(?P<before_numbers>{SECTION_LIST})"
+            rf"|(?:{SECTION_WORD}\s*)?(?P<after_numbers>{SECTION_LIST})\s*,?\s*(?:(?:of|under)\s+(?:the\s+)?)?(?:{law_after})\b)",
+            re.IGNORECASE
+        )
+        self.number_pattern = re.compile(SECTION_NUMBER, re.IGNORECASE)
+    
+    def references(self, query: str) -> List[Tuple[str, str]]:
+        """(law_type, section_number) pairs named in the query, in order of appearance, without duplicates"""
+        references = []
+        for match in self.pattern.finditer(query):
+            groups = {name: value for name, value in match.groupdict().items() if value}
+            law_type = next(name.split("_", 1)[1] for name in groups if name.startswith(("before_", "after_")) and not name.endswith("_numbers"))
+            numbers = groups.get("before_numbers") or groups.get("after_numbers")
+            for number in self.number_pattern.findall(numbers):
+                reference = (law_type, number.upper())
+                if reference not in references:
+                    references.append(reference)
+        return references
+    
+    def resolve(self, query: str) -> List[Dict[str, Any]]:
+        """Indexed sections for every known reference in the query: [{"id", "properties"}]"""
+        return [self.sections[reference] for reference in self.references(query) if reference in self.sections]
+    
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base_path: str = KNOWLEDGE_BASE_PATH) -> "SectionResolver":
+        """Index every CyberLaw section (bns.json, ipc.json, it.json) by law type and section number"""
+        sections = {}
+        for filename, collection_name, items_key, record_builder in KNOWLEDGE_BASE_SOURCES:
+            file_path = os.path.join(knowledge_base_path, filename)
+            if collection_name != "CyberLaw" or not os.path.exists(file_path):
+                continue
+            for record in load_records(file_path, items_key, record_builder):
+                properties = record["properties"]
+                sections[(properties["law_type"], str(properties["section_number"]).upper())] = {
+                    "id": record_uuid(collection_name, record["key"]),
+                    "properties": properties
+                }
+        return cls(sections)
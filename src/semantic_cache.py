@@ -0,0 +1,123 @@
+"""
+Semantic Response Cache
+Stores final chatbot responses with the embedding of the (English) query that produced them.
+A new query is answered from the cache when its cosine similarity to a stored query reaches
+SEMANTIC_CACHE_THRESHOLD and the reply language and scope match, so paraphrases of a common question
+skip retrieval and generation. The scope is an exact key for whatever the embedding cannot be trusted
+to tell apart (section numbers, named states, the conversation the answer was written for). Embeddings live in one preallocated, L2-normalized matrix, so a
+lookup is a single matrix-vector product. Entries are LRU-evicted beyond SEMANTIC_CACHE_SIZE and
+dropped whenever the corpus version changes.
+"""
+
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+class SemanticResponseCache:
+    def __init__(self, threshold: float = None, max_entries: int = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('SEMANTIC_CACHE_SIZE', '256'))
+        
+        self.lock = threading.Lock()
+        self.matrix = None      # (max_entries, d) float32, one normalized query embedding per slot
+        self.languages = np.empty(max(self.max_entries, 0), dtype=object)
+        self.scopes = np.empty(max(self.max_entries, 0), dtype=object)
+        self.active = np.zeros(max(self.max_entries, 0), dtype=bool)
+        self.entries = OrderedDict()  # slot -> {"query", "language", "scope", "response"}, least recently used first
+        self.corpus_version = None
+        self.stats_counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    @staticmethod
+    def _normalize(vector: List[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else None
+    
+    def _reset(self):
+        self.entries.clear()
+        self.active[:] = False
+        self.languages[:] = None
+        self.scopes[:] = None
+    
+    def _check_version(self, corpus_version: str):
+        """Drop every answer generated from an older corpus"""
+        if corpus_version != self.corpus_version:
+            if self.entries:
+                self.stats_counters["invalidations"] += len(self.entries)
+                self._reset()
+            self.corpus_version = corpus_version
+    
+    def lookup(self, query_vector: List[float], language: str, corpus_version: str, scope: str = "") -> Optional[Dict[str, Any]]:
+        """Most similar cached answer in the same language and scope: {"query", "response", "similarity"}, or None"""
+        if not self.enabled or not query_vector:
+            return None
+        vector = self._normalize(query_vector)
+        
+        with self.lock:
+            self._check_version(corpus_version)
+            if vector is None or self.matrix is None or self.matrix.shape[1] != vector.shape[0] or not self.entries:
+                self.stats_counters["misses"] += 1
+                return None
+            
+            scores = self.matrix @ vector
+            scores[~(self.active & (self.languages == language) & (self.scopes == scope))] = -np.inf
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            if similarity < self.threshold:
+                self.stats_counters["misses"] += 1
+                return None
+            
+            self.entries.move_to_end(slot)
+            self.stats_counters["hits"] += 1
+            entry = self.entries[slot]
+            return {"query": entry["query"], "response": entry["response"], "similarity": similarity}
+    
+    def store(self, query: str, query_vector: List[float], language: str, corpus_version: str, response: str, scope: str = ""):
+        """Cache a response, evicting the least recently used entry when full"""
+        if not self.enabled or not query_vector or not response:
+            return
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return
+        
+        with self.lock:
+            self._check_version(corpus_version)
+            if self.matrix is None or self.matrix.shape[1] != vector.shape[0]:
+                # First entry, or the embedding model changed
+                self.matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._reset()
+            
+            if len(self.entries) < self.max_entries:
+                slot = int(np.flatnonzero(~self.active)[0])
+            else:
+                slot, _ = self.entries.popitem(last=False)
+                self.stats_counters["evictions"] += 1
+            
+            self.matrix[slot] = vector
+            self.languages[slot] = language
+            self.scopes[slot] = scope
+            self.active[slot] = True
+            self.entries[slot] = {"query": query, "language": language, "scope": scope, "response": response}
+    
+    def clear(self):
+        with self.lock:
+            self._reset()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratio, size and configuration"""
+        with self.lock:
+            stats = dict(self.stats_counters)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self.entries)
+            stats["max_entries"] = self.max_entries
+            stats["threshold"] = self.threshold
+            stats["memory_bytes"] = self.matrix.nbytes if self.matrix is not None else 0
+            stats["corpus_version"] = self.corpus_version
+            return stats
@@ -0,0 +1,35 @@
+"""
+Language Detector checks
+Run from the repository root: python -m unittest discover -s src -p "test_*.py"
+"""
+
+import unittest
+from language_detector import detect_language
+
+class DetectLanguageTest(unittest.TestCase):
+    def assertLanguage(self, text: str, language: str, needs_translation: bool):
+        detected = detect_language(text)
+        self.assertEqual(detected["language"], language, text)
+        self.assertEqual(detected["needs_translation"], needs_translation, text)
+    
+    def test_short_hinglish_needs_one_marker(self):
+        self.assertLanguage("phishing complaint kaise kare", "Hinglish", True)
+        self.assertLanguage("account hack ho gaya", "Hinglish", True)
+    
+    def test_long_hinglish(self):
+        self.assertLanguage("mera account hack ho gaya hai, mujhe kya karna chahiye?", "Hinglish", True)
+    
+    def test_english(self):
+        self.assertLanguage("What is the punishment for online fraud?", "English", False)
+        self.assertLanguage("IT Act 66C", "English", False)
+        self.assertLanguage("phishing email complaint", "English", False)
+    
+    def test_other_latin_language(self):
+        self.assertLanguage("Qu'est-ce que le piratage?", "Other", True)
+    
+    def test_native_script(self):
+        self.assertLanguage("किसी ने मेरा सोशल मीडिया अकाउंट हैक कर लिया है", "Hindi", True)
+        self.assertLanguage("माझे ईमेल खाते हॅक झाले आहे", "Marathi", True)
+
+if __name__ == "__main__":
+    unittest.main()
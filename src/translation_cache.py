@@ -0,0 +1,40 @@
+"""
+Translation Cache
+Persistent cache of English translations, keyed by normalized source text and translation model,
+so repeated non-English questions skip the translation model call.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from persistent_cache import PersistentLRUCache
+
+class TranslationCache(PersistentLRUCache):
+    def __init__(self, db_path: str = None, max_entries: int = None):
+        super().__init__(
+            db_path or os.getenv('TRANSLATION_CACHE_PATH', 'CYBERLAW_CHATBOT/cache/translations.sqlite3'),
+            table="translations",
+            max_entries=max_entries or int(os.getenv('TRANSLATION_CACHE_SIZE', '2048'))
+        )
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize unicode form, case and whitespace so trivially different queries share an entry"""
+        return " ".join(unicodedata.normalize('NFKC', text).casefold().split())
+    
+    def make_key(self, text: str, model: str) -> str:
+        """Content address for a (text, model) pair"""
+        material = f"{model}\x00{self.normalize_text(text)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+def get_translation_cache() -> TranslationCache:
+    """Get or initialize the process-wide translation cache"""
+    global _translation_cache
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache()
+        return _translation_cache
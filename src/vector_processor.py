@@ -1,14 +1,40 @@
+import hashlib
 import json
 import os
+import sys
+import time
 from dotenv import load_dotenv
 import weaviate
 from weaviate.classes.config import Configure
+from weaviate.classes.query import Filter
 import google.generativeai as genai
 from typing import List, Dict, Any
+from knowledge_base import (
+    KNOWLEDGE_BASE_PATH, KNOWLEDGE_BASE_SOURCES, JsonArrayStream, iter_chunks, iter_records,
+    load_records, record_uuid, bns_record, ipc_record, it_act_record, faq_record, nodal_officer_record
+)
+from embedding_pipeline import EmbeddingPipeline
+from index_registry import IndexRegistry
+from vector_snapshot import SnapshotWriter
+from weaviate_connection import get_weaviate_manager
 
 load_dotenv()
 
+class UploadError(Exception):
+    """Raised when objects could not be written to Weaviate; `written` is how many of the batch were stored"""
+    
+    def __init__(self, message: str, written: int = 0):
+        super().__init__(message)
+        self.written = written
+
 class VectorProcessor:
+    # Properties stored in each collection (all TEXT)
+    COLLECTION_PROPERTIES = {
+        "CyberLaw": ["section_number", "title", "content", "law_type", "summary", "full_text", "source_file"],
+        "FAQ": ["question", "answer", "category", "source_file"],
+        "NodalOfficer": ["state", "officer_name", "rank", "email", "contact", "source_file"]
+    }
+    
     def __init__(self):
         self.weaviate_url = os.getenv('WEAVIATE_URL')
         self.weaviate_api_key = os.getenv('WEAVIATE_API_KEY')
@@ -16,208 +42,109 @@ class VectorProcessor:
         
         genai.configure(api_key=self.google_api_key)
         
-        self.client = weaviate.connect_to_wcs(
-            cluster_url=self.weaviate_url,
-            auth_credentials=weaviate.auth.AuthApiKey(self.weaviate_api_key)
-        )
+        self.embedding_model = f"models/{os.getenv('EMBEDDING_MODEL', 'text-embedding-004')}"
+        self.snapshot_path = os.getenv('VECTOR_SNAPSHOT_PATH', 'CYBERLAW_CHATBOT/snapshots')
+        
+        # Batched, rate-limited embedding (EMBED_BATCH_SIZE, EMBED_WORKERS, EMBED_REQUESTS_PER_MINUTE)
+        self.embedding_pipeline = EmbeddingPipeline(self.embedding_model, task_type="retrieval_document")
+        
+        # Knowledge base files are parsed, embedded and uploaded this many records at a time
+        self.ingest_chunk_size = int(os.getenv('INGEST_CHUNK_SIZE', '500'))
+        
+        # Shared, health-checked Weaviate client
+        self.connection = get_weaviate_manager()
         
+        # Resolves logical collection names to the active versioned collections
+        self.index_registry = IndexRegistry(self.connection, ttl=0)
+    
+    @property
+    def client(self):
+        return self.connection.client()
+    
+    def _create_collection(self, name: str, physical_name: str = None):
+        """Create a collection with its TEXT properties plus the content_hash used for incremental ingest"""
+        self.client.collections.create(
+            name=physical_name or name,
+            properties=[
+                weaviate.classes.config.Property(name=property_name, data_type=weaviate.classes.config.DataType.TEXT)
+                for property_name in self.COLLECTION_PROPERTIES[name] + ["content_hash"]
+            ]
+        )
+    
     def create_schema(self):
         try:
-            if self.client.collections.exists("CyberLaw"):
-                self.client.collections.delete("CyberLaw")
-            if self.client.collections.exists("FAQ"):
-                self.client.collections.delete("FAQ")
-            if self.client.collections.exists("NodalOfficer"):
-                self.client.collections.delete("NodalOfficer")
-            
-            self.client.collections.create(
-                name="CyberLaw",
-                properties=[
-                    weaviate.classes.config.Property(name="section_number", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="title", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="content", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="law_type", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="summary", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="full_text", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="source_file", data_type=weaviate.classes.config.DataType.TEXT)
-                ]
-            )
-            
-            self.client.collections.create(
-                name="FAQ",
-                properties=[
-                    weaviate.classes.config.Property(name="question", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="answer", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="category", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="source_file", data_type=weaviate.classes.config.DataType.TEXT)
-                ]
-            )
+            for name in self.COLLECTION_PROPERTIES:
+                if self.client.collections.exists(name):
+                    self.client.collections.delete(name)
             
-            self.client.collections.create(
-                name="NodalOfficer",
-                properties=[
-                    weaviate.classes.config.Property(name="state", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="officer_name", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="rank", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="email", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="contact", data_type=weaviate.classes.config.DataType.TEXT),
-                    weaviate.classes.config.Property(name="source_file", data_type=weaviate.classes.config.DataType.TEXT)
-                ]
-            )
+            for name in self.COLLECTION_PROPERTIES:
+                self._create_collection(name)
             
             print("Schema created successfully!")
         except Exception as e:
             print(f"Error creating schema: {e}")
     
+    def ensure_schema(self):
+        """Create any missing collections without touching existing data"""
+        for name in self.COLLECTION_PROPERTIES:
+            physical_name = self.index_registry.collection_name(name)
+            if not self.client.collections.exists(physical_name):
+                self._create_collection(name, physical_name)
+                print(f"Created collection {physical_name}")
+            else:
+                collection = self.client.collections.get(physical_name)
+                existing = {prop.name for prop in collection.config.get().properties}
+                if "content_hash" not in existing:
+                    collection.config.add_property(
+                        weaviate.classes.config.Property(name="content_hash", data_type=weaviate.classes.config.DataType.TEXT)
+                    )
+    
     def generate_embedding(self, text: str) -> List[float]:
-        try:
-            result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=text,
-                task_type="retrieval_document"
-            )
-            return result['embedding']
-        except Exception as e:
-            print(f"Error generating embedding: {e}")
-            return []
+        """Embed a single document; raises EmbeddingError rather than returning an empty vector"""
+        return self.embedding_pipeline.embed([text])[0]
     
-    def process_bns_data(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def content_hash(self, record: Dict[str, Any]) -> str:
+        """Hash of everything that determines a stored object: embedded text, properties and embedding model"""
+        material = json.dumps(
+            {"model": self.embedding_model, "text": record["text"], "properties": record["properties"]},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def embed_records(self, records: List[Dict[str, Any]], collection_name: str) -> List[Dict]:
+        """Attach an embedding and a deterministic object id to each knowledge base record"""
+        start = time.perf_counter()
+        embeddings = self.embedding_pipeline.embed([record["text"] for record in records])
+        if records:
+            print(f"Embedded {len(records)} records in {time.perf_counter() - start:.1f}s")
         
         objects = []
-        for section in data['bns_sections']:
-            content = f"Section {section['section_number']}: {section['title']}\n{section['summary']}"
-            full_text = json.dumps(section['full_legal_text'])
-            
-            embedding = self.generate_embedding(content)
-            
+        for record, embedding in zip(records, embeddings):
             objects.append({
-                "properties": {
-                    "section_number": section['section_number'],
-                    "title": section['title'],
-                    "content": content,
-                    "law_type": "BNS",
-                    "summary": section['summary'],
-                    "full_text": full_text,
-                    "source_file": "bns.json"
-                },
+                "id": record_uuid(collection_name, record["key"]),
+                "properties": dict(record["properties"], content_hash=self.content_hash(record)),
                 "vector": embedding
             })
         
         return objects
     
+    def process_bns_data(self, file_path: str):
+        return self.embed_records(load_records(file_path, "bns_sections", bns_record), "CyberLaw")
+    
     def process_ipc_data(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        objects = []
-        for section in data['ipc_sections']:
-            content = f"Section {section['section_number']}: {section['title']}\n{section['plain_english']}"
-            
-            full_text = section['official_text']
-            if isinstance(full_text, dict):
-                full_text = json.dumps(full_text)
-            
-            embedding = self.generate_embedding(content)
-            
-            objects.append({
-                "properties": {
-                    "section_number": section['section_number'],
-                    "title": section['title'],
-                    "content": content,
-                    "law_type": "IPC",
-                    "summary": section['plain_english'],
-                    "full_text": str(full_text),
-                    "source_file": "ipc.json"
-                },
-                "vector": embedding
-            })
-        
-        return objects
+        return self.embed_records(load_records(file_path, "ipc_sections", ipc_record), "CyberLaw")
     
     def process_it_act_data(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        objects = []
-        for section in data['it_act_sections']:
-            content = f"Section {section['section_number']}: {section['title']}\n{section['summary']}"
-            full_text = json.dumps(section['full_legal_text'])
-            
-            embedding = self.generate_embedding(content)
-            
-            objects.append({
-                "properties": {
-                    "section_number": section['section_number'],
-                    "title": section['title'],
-                    "content": content,
-                    "law_type": "IT_ACT",
-                    "summary": section['summary'],
-                    "full_text": full_text,
-                    "source_file": "it.json"
-                },
-                "vector": embedding
-            })
-        
-        return objects
+        return self.embed_records(load_records(file_path, "it_act_sections", it_act_record), "CyberLaw")
     
     def process_faq_data(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        objects = []
-        
-        if isinstance(data, list):
-            faq_list = data
-        elif isinstance(data, dict) and 'faqs' in data:
-            faq_list = data['faqs']
-        else:
-            print(f"Unknown FAQ format in {file_path}")
-            return objects
-        
-        for item in faq_list:
-            content = f"Q: {item['question']}\nA: {item['answer']}"
-            
-            embedding = self.generate_embedding(content)
-            
-            objects.append({
-                "properties": {
-                    "question": item['question'],
-                    "answer": item['answer'],
-                    "category": "cybercrime_faq",
-                    "source_file": os.path.basename(file_path)
-                },
-                "vector": embedding
-            })
-        
-        return objects
+        return self.embed_records(load_records(file_path, "faqs", faq_record), "FAQ")
     
     def process_nodal_officers_data(self, file_path: str):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        objects = []
-        for officer in data:
-            content = f"State: {officer['state_ut']}\nNodal Officer: {officer['nodal_officer']['name']}, {officer['nodal_officer']['rank']}\nEmail: {officer['nodal_officer']['email']}"
-            
-            embedding = self.generate_embedding(content)
-            
-            objects.append({
-                "properties": {
-                    "state": officer['state_ut'],
-                    "officer_name": officer['nodal_officer']['name'],
-                    "rank": officer['nodal_officer']['rank'],
-                    "email": officer['nodal_officer']['email'],
-                    "contact": officer.get('grievance_officer', {}).get('contact', ''),
-                    "source_file": "nodal_officers.json"
-                },
-                "vector": embedding
-            })
-        
-        return objects
+        return self.embed_records(load_records(file_path, None, nodal_officer_record), "NodalOfficer")
     
     def batch_upload(self, collection_name: str, objects: List[Dict]):
+        """Insert objects; raises UploadError if any of them was not written"""
         try:
             collection = self.client.collections.get(collection_name)
             
@@ -226,63 +153,239 @@ class VectorProcessor:
                 data_objects.append(
                     weaviate.classes.data.DataObject(
                         properties=obj["properties"],
-                        vector=obj["vector"]
+                        vector=obj["vector"],
+                        uuid=obj.get("id")
                     )
                 )
             
-            collection.data.insert_many(data_objects)
-            print(f"Successfully uploaded {len(objects)} objects to {collection_name}")
+            result = collection.data.insert_many(data_objects)
         except Exception as e:
             print(f"Error uploading objects to {collection_name}: {e}")
+            raise UploadError(f"Upload of {len(objects)} objects to {collection_name} failed: {e}") from e
+        
+        if result.has_errors:
+            first_error = next(iter(result.errors.values()))
+            message = (f"{len(result.errors)} of {len(objects)} objects failed to upload to {collection_name}: "
+                       f"{getattr(first_error, 'message', first_error)}")
+            print(f"Error uploading objects to {collection_name}: {message}")
+            raise UploadError(message, written=len(objects) - len(result.errors))
+        print(f"Successfully uploaded {len(objects)} objects to {collection_name}")
+    
+    def _report_progress(self, stream: JsonArrayStream):
+        print(f"  {os.path.basename(stream.file_path)}: {stream.items} records, "
+              f"{stream.progress:.0%} of {stream.total_bytes / 1024:.0f} KB read")
     
-    def process_all_files(self):
-        knowledge_base_path = "Knowledge_base"
+    def _ingest_files(self, collection_names: Dict[str, str], snapshot: SnapshotWriter = None) -> Dict[str, int]:
+        """Stream every knowledge base file into the given physical collections in bounded chunks; returns objects per collection"""
+        counts = {name: 0 for name in self.COLLECTION_PROPERTIES}
+        for filename, collection_name, items_key, record_builder in KNOWLEDGE_BASE_SOURCES:
+            file_path = os.path.join(KNOWLEDGE_BASE_PATH, filename)
+            if not os.path.exists(file_path):
+                print(f"File {filename} not found")
+                continue
+            
+            print(f"Processing {filename}...")
+            stream = JsonArrayStream(file_path, items_key)
+            for records in iter_chunks(iter_records(stream, record_builder), self.ingest_chunk_size):
+                objects = self.embed_records(records, collection_name)
+                self.batch_upload(collection_names[collection_name], objects)
+                counts[collection_name] += len(objects)
+                
+                if snapshot:
+                    for obj in objects:
+                        if obj["vector"]:
+                            snapshot.add(collection_name, obj["id"], obj["vector"], obj["properties"])
+                self._report_progress(stream)
         
-        law_processors = {
-            "bns.json": self.process_bns_data,
-            "ipc.json": self.process_ipc_data,
-            "it.json": self.process_it_act_data,
-        }
+        return counts
+    
+    def process_all_files(self, write_snapshot: bool = True):
+        collection_names = {name: self.index_registry.collection_name(name) for name in self.COLLECTION_PROPERTIES}
         
-        faq_processors = {
-            "cybercrime_faq_dynamic.json": self.process_faq_data,
-            "faq.json": self.process_faq_data,
-        }
+        # Keep a local copy of everything we embed so searchers can memory-map it at startup
+        snapshot = SnapshotWriter(self.snapshot_path, self.embedding_model) if write_snapshot else None
         
-        officer_processors = {
-            "nodal_officers.json": self.process_nodal_officers_data
-        }
+        try:
+            self._ingest_files(collection_names, snapshot)
+            if snapshot:
+                snapshot.commit()
+        except Exception:
+            if snapshot:
+                snapshot.abort()
+            raise
         
-        for filename, processor in law_processors.items():
-            file_path = os.path.join(knowledge_base_path, filename)
-            if os.path.exists(file_path):
-                print(f"Processing {filename}...")
-                objects = processor(file_path)
-                self.batch_upload("CyberLaw", objects)
-            else:
-                print(f"File {filename} not found")
+        self.bump_corpus_version()
+    
+    def bump_corpus_version(self):
+        """Invalidate searchers' cached results for the previous corpus"""
+        corpus_version = self.index_registry.bump_corpus_version(list(self.COLLECTION_PROPERTIES))
+        print(f"Corpus version is now {corpus_version}")
+    
+    def count_objects(self, collection_name: str) -> int:
+        return self.client.collections.get(collection_name).aggregate.over_all(total_count=True).total_count
+    
+    def blue_green_rebuild(self, keep: int = None, write_snapshot: bool = True) -> int:
+        """
+        Rebuild every collection without downtime: ingest into new versioned collections
+        (CyberLaw_v42, ...), validate object counts, atomically switch the index pointer,
+        then garbage-collect old versions (INDEX_KEEP_VERSIONS, default 2). Returns the new version.
+        """
+        bases = list(self.COLLECTION_PROPERTIES)
+        keep = keep if keep is not None else int(os.getenv('INDEX_KEEP_VERSIONS', '2'))
+        version = self.index_registry.next_version(bases)
+        physical_names = {base: IndexRegistry.versioned_name(base, version) for base in bases}
+        print(f"Building index version {version}: {', '.join(physical_names.values())}")
         
-        for filename, processor in faq_processors.items():
-            file_path = os.path.join(knowledge_base_path, filename)
-            if os.path.exists(file_path):
-                print(f"Processing {filename}...")
-                objects = processor(file_path)
-                self.batch_upload("FAQ", objects)
-            else:
-                print(f"File {filename} not found")
+        snapshot = SnapshotWriter(self.snapshot_path, self.embedding_model) if write_snapshot else None
+        try:
+            for base, physical_name in physical_names.items():
+                self._create_collection(base, physical_name)
+            
+            expected = self._ingest_files(physical_names, snapshot)
+            
+            for base, physical_name in physical_names.items():
+                actual = self.count_objects(physical_name)
+                if actual != expected[base]:
+                    raise RuntimeError(f"{physical_name} has {actual} objects, expected {expected[base]}")
+        except Exception:
+            # Leave the live version untouched and drop the half-built one
+            if snapshot:
+                snapshot.abort()
+            for physical_name in physical_names.values():
+                if self.client.collections.exists(physical_name):
+                    self.client.collections.delete(physical_name)
+            raise
+        
+        self.index_registry.write_pointer(version, physical_names)
+        print(f"Switched index pointer to version {version}")
+        if snapshot:
+            snapshot.commit()
+        
+        self.index_registry.garbage_collect(bases, keep)
+        return version
+    
+    def incremental_ingest(self, write_snapshot: bool = True) -> Dict[str, Dict[str, int]]:
+        """
+        Sync the collections with Knowledge_base without dropping them.
+        Objects are addressed by deterministic uuids; only records whose content hash changed are
+        re-embedded and upserted, and objects no longer in the knowledge base are deleted.
+        Returns added/updated/deleted/skipped counts per collection.
+        """
+        self.ensure_schema()
+        snapshot = SnapshotWriter(self.snapshot_path, self.embedding_model) if write_snapshot else None
+        report = {}
+        
+        try:
+            for collection_name in self.COLLECTION_PROPERTIES:
+                physical_name = self.index_registry.collection_name(collection_name)
+                collection = self.client.collections.get(physical_name)
+                counts = {"added": 0, "updated": 0, "deleted": 0, "skipped": 0}
+                report[collection_name] = counts
+                
+                # Current state: uuid -> content_hash (vectors are only fetched per chunk, for the snapshot)
+                existing = {
+                    str(item.uuid): item.properties.get('content_hash')
+                    for item in collection.iterator(return_properties=["content_hash"])
+                }
+                seen = set()
+                
+                for filename, source_collection, items_key, record_builder in KNOWLEDGE_BASE_SOURCES:
+                    if source_collection != collection_name:
+                        continue
+                    file_path = os.path.join(KNOWLEDGE_BASE_PATH, filename)
+                    if not os.path.exists(file_path):
+                        print(f"File {filename} not found")
+                        continue
+                    
+                    stream = JsonArrayStream(file_path, items_key)
+                    for records in iter_chunks(iter_records(stream, record_builder), self.ingest_chunk_size):
+                        self._sync_chunk(collection, physical_name, collection_name, records, existing, seen, counts, snapshot)
+                        self._report_progress(stream)
+                
+                removed = [object_id for object_id in existing if object_id not in seen]
+                for chunk in iter_chunks(removed, self.ingest_chunk_size):
+                    collection.data.delete_many(where=Filter.by_id().contains_any(chunk))
+                counts["deleted"] = len(removed)
+                
+                print(f"{collection_name}: {counts['added']} added, {counts['updated']} updated, "
+                      f"{counts['deleted']} deleted, {counts['skipped']} unchanged")
+            
+            if snapshot:
+                snapshot.commit()
+        except Exception:
+            if snapshot:
+                snapshot.abort()
+            # Objects written before the failure are live; unwritten ones keep their old hash and are retried next sync
+            if self.corpus_changed(report):
+                self.bump_corpus_version()
+            raise
         
-        for filename, processor in officer_processors.items():
-            file_path = os.path.join(knowledge_base_path, filename)
-            if os.path.exists(file_path):
-                print(f"Processing {filename}...")
-                objects = processor(file_path)
-                self.batch_upload("NodalOfficer", objects)
+        # A no-op sync must not flush every worker's retrieval and response caches
+        if self.corpus_changed(report):
+            self.bump_corpus_version()
+        else:
+            print("Knowledge base unchanged, corpus version kept")
+        return report
+    
+    @staticmethod
+    def corpus_changed(report: Dict[str, Dict[str, int]]) -> bool:
+        return any(counts["added"] or counts["updated"] or counts["deleted"] for counts in report.values())
+    
+    def _sync_chunk(self, collection, physical_name: str, collection_name: str, records: List[Dict[str, Any]],
+                    existing: Dict[str, str], seen: set, counts: Dict[str, int], snapshot: SnapshotWriter = None):
+        """Upsert one chunk of records against the existing content hashes"""
+        new_records, changed_records, unchanged_ids = [], [], []
+        for record in records:
+            object_id = record_uuid(collection_name, record["key"])
+            if object_id in seen:
+                print(f"Duplicate record {record['key']} in {collection_name}, keeping the first one")
+                continue
+            seen.add(object_id)
+            
+            if object_id not in existing:
+                new_records.append(record)
+            elif existing[object_id] != self.content_hash(record):
+                changed_records.append(record)
             else:
-                print(f"File {filename} not found")
+                counts["skipped"] += 1
+                unchanged_ids.append(object_id)
+        
+        new_objects = self.embed_records(new_records, collection_name)
+        if new_objects:
+            try:
+                self.batch_upload(physical_name, new_objects)
+            except UploadError as e:
+                counts["added"] += e.written
+                raise
+            counts["added"] += len(new_objects)
+        
+        for obj in self.embed_records(changed_records, collection_name):
+            collection.data.replace(uuid=obj["id"], properties=obj["properties"], vector=obj["vector"])
+            counts["updated"] += 1
+            new_objects.append(obj)
+        
+        if snapshot:
+            for obj in new_objects:
+                if obj["vector"]:
+                    snapshot.add(collection_name, obj["id"], obj["vector"], obj["properties"])
+            
+            if unchanged_ids:
+                response = collection.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(unchanged_ids),
+                    include_vector=True,
+                    limit=len(unchanged_ids)
+                )
+                for item in response.objects:
+                    vector = item.vector.get("default") if isinstance(item.vector, dict) else item.vector
+                    if vector:
+                        snapshot.add(collection_name, str(item.uuid), vector, item.properties)
 
 if __name__ == "__main__":
     processor = VectorProcessor()
-    processor.create_schema()
-    processor.process_all_files()
+    if "--full" in sys.argv:
+        # Rebuild every collection into a new version and switch to it once validated
+        processor.blue_green_rebuild()
+    else:
+        processor.incremental_ingest()
     print("Vector processing completed!")
-    processor.client.close()
+    processor.connection.close()
\ No newline at end of file
@@ -1,39 +1,385 @@
+import asyncio
+import json
 import os
+import threading
+import time
 import weaviate
 import google.generativeai as genai
 from dotenv import load_dotenv
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Callable
+from bm25_index import BM25Index
+from embedding_cache import get_embedding_cache
+from index_registry import IndexRegistry
+from knowledge_base import load_all_records
+from local_embedder import LocalHashingEmbedder
+from local_vector_index import LocalVectorIndex
+from result_merger import ResultMerger
+from retrieval_cache import RetrievalCache
+from retrieval_policy import load_policies
+from nodal_directory import NodalDirectory
+from section_resolver import SectionResolver
+from weaviate_connection import get_weaviate_manager
+from vector_snapshot import VectorSnapshot
 
 load_dotenv()
 
+class SearchResult(dict):
+    """Result dict whose unprojected properties (lazy_fields) are fetched through loader on first access"""
+    
+    def __init__(self, data: Dict[str, Any], loader: Callable[[str], Any] = None, lazy_fields: List[str] = ()):
+        super().__init__(data)
+        self.loader = loader
+        self.lazy_fields = list(lazy_fields)
+    
+    def __missing__(self, key: str) -> Any:
+        if key in self.lazy_fields and self.loader is not None:
+            value = self.loader(key)
+            self[key] = value
+            return value
+        raise KeyError(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self or (key in self.lazy_fields and self.loader is not None):
+            return self[key]
+        return default
+
 class VectorSearcher:
+    # Weaviate collection backing each result category
+    COLLECTIONS = {
+        "cyberlaw": "CyberLaw",
+        "faq": "FAQ",
+        "nodal_officers": "NodalOfficer"
+    }
+    
+    # Results requested per category by comprehensive_search and batch_search
+    DEFAULT_LIMITS = {
+        "cyberlaw": 15,  # Increased from 3 to 15
+        "faq": 8,  # Increased from 2 to 8
+        "nodal_officers": 8
+    }
+    
+    # Properties each result category can carry
+    RESULT_FIELDS = {
+        "cyberlaw": ["section_number", "title", "content", "law_type", "summary", "full_text", "source_file"],
+        "faq": ["question", "answer", "category", "source_file"],
+        "nodal_officers": ["state", "officer_name", "rank", "email", "contact", "source_file"]
+    }
+    
+    # Properties fetched with every search; the rest (full_text) are loaded by id on first access
+    RETURN_PROPERTIES = {
+        "cyberlaw": ["section_number", "title", "content", "law_type", "summary", "source_file"],
+        "faq": RESULT_FIELDS["faq"],
+        "nodal_officers": RESULT_FIELDS["nodal_officers"]
+    }
+    
+    # Hybrid retrieval ranks exact-term matches well, so fewer results fill the prompt
+    HYBRID_LIMITS = {
+        "cyberlaw": 8,
+        "faq": 5,
+        "nodal_officers": 5
+    }
+    
+    # Per-category rank fusion weights; `candidates` is how many results (as a multiple of the
+    # limit) each retriever contributes before fusion. Override with the HYBRID_SETTINGS env var (JSON).
+    HYBRID_SETTINGS = {
+        "cyberlaw": {"vector_weight": 1.0, "bm25_weight": 1.0, "candidates": 3},
+        "faq": {"vector_weight": 1.0, "bm25_weight": 0.5, "candidates": 2},
+        "nodal_officers": {"vector_weight": 1.0, "bm25_weight": 1.0, "candidates": 2}
+    }
+    
+    # Reciprocal rank fusion constant: score = sum(weight / (RRF_K + rank))
+    RRF_K = 60
+    
+    # Embedding models that place non-English queries near the English corpus (QUERY_PIPELINE=direct)
+    MULTILINGUAL_EMBEDDING_MODELS = {"models/gemini-embedding-001", "models/gemini-embedding-exp-03-07"}
+    
     def __init__(self):
         self.weaviate_url = os.getenv('WEAVIATE_URL')
         self.weaviate_api_key = os.getenv('WEAVIATE_API_KEY')
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
         
-        if not all([self.weaviate_url, self.weaviate_api_key, self.google_api_key]):
-            raise ValueError("Missing required environment variables: WEAVIATE_URL, WEAVIATE_API_KEY, GOOGLE_API_KEY")
+        # VECTOR_BACKEND: "weaviate" (query Weaviate Cloud) or "local" (in-process NumPy index,
+        # memory-mapped from the VECTOR_SNAPSHOT_PATH snapshot when one exists for the embedding model)
+        # EMBEDDING_BACKEND: "gemini" or "local" (offline stand-in embedder, index built from Knowledge_base)
+        self.vector_backend = os.getenv('VECTOR_BACKEND', 'weaviate').lower()
+        self.embedding_backend = os.getenv('EMBEDDING_BACKEND', 'gemini').lower()
+        offline = self.vector_backend == "local" and self.embedding_backend == "local"
+        
+        if self.embedding_backend == "local":
+            self.local_embedder = LocalHashingEmbedder()
+            self.embedding_model = self.local_embedder.model_name
+        else:
+            if not self.google_api_key:
+                raise ValueError("Missing required environment variable: GOOGLE_API_KEY")
+            genai.configure(api_key=self.google_api_key)
+            self.local_embedder = None
+            self.embedding_model = f"models/{os.getenv('EMBEDDING_MODEL', 'text-embedding-004')}"
+        
+        self.embedding_cache = get_embedding_cache()
+        self.multilingual_embeddings = self.embedding_model in self.MULTILINGUAL_EMBEDDING_MODELS
+        
+        # Shared, health-checked Weaviate client (none when fully offline)
+        self.connection = get_weaviate_manager() if not offline else None
+        
+        # Logical collection names resolve to the active blue/green version (refreshed every INDEX_POINTER_TTL seconds)
+        self.index_registry = IndexRegistry(self.connection) if self.connection is not None else None
         
-        genai.configure(api_key=self.google_api_key)
+        self.local_index = None
+        self.local_corpus_version = None
+        if self.vector_backend == "local":
+            snapshot = VectorSnapshot.current(os.getenv('VECTOR_SNAPSHOT_PATH', 'CYBERLAW_CHATBOT/snapshots'))
+            if snapshot is not None and snapshot.embedding_model == self.embedding_model:
+                self.local_index = LocalVectorIndex.from_snapshot(snapshot)
+                self.local_corpus_version = f"snapshot-{snapshot.version}"
+            elif offline:
+                self.local_index = LocalVectorIndex.from_records(load_all_records(), self.local_embedder.embed)
+                self.local_corpus_version = "knowledge-base"
+            else:
+                self.local_index = LocalVectorIndex.from_weaviate(
+                    self.client,
+                    {name: self.index_registry.collection_name(name) for name in self.COLLECTIONS.values()}
+                )
+                self.local_corpus_version = f"weaviate-{self.index_registry_version()}"
         
-        self.client = weaviate.connect_to_weaviate_cloud(
-            cluster_url=self.weaviate_url,
-            auth_credentials=weaviate.auth.AuthApiKey(self.weaviate_api_key)
+        # SEARCH_FULL_TEXT=true returns full_text with every result instead of fetching it lazily
+        self.return_properties = dict(self.RETURN_PROPERTIES)
+        if os.getenv('SEARCH_FULL_TEXT', 'false').lower() == 'true':
+            self.return_properties = dict(self.RESULT_FIELDS)
+        
+        # RETRIEVAL_MODE: "vector" (near_vector only) or "hybrid" (vector + local BM25, fused by rank)
+        self.retrieval_mode = os.getenv('RETRIEVAL_MODE', 'vector').lower()
+        self.hybrid_settings = {category: dict(settings) for category, settings in self.HYBRID_SETTINGS.items()}
+        for category, overrides in json.loads(os.getenv('HYBRID_SETTINGS', '{}')).items():
+            self.hybrid_settings.setdefault(category, {}).update(overrides)
+        
+        # Built from the objects vector search returns, and rebuilt whenever corpus_version changes
+        self.bm25_index = None
+        self.bm25_version = None
+        self.bm25_lock = threading.Lock()
+        if self.retrieval_mode == "hybrid":
+            self.bm25_version = self.corpus_version()
+            self.bm25_index = self._build_bm25_index()
+        self.default_limits = self.HYBRID_LIMITS if self.bm25_index is not None else self.DEFAULT_LIMITS
+        
+        # Exact lookups for queries that name a provision ("IT Act 66E", "section 420 IPC")
+        self.section_resolver = SectionResolver.from_knowledge_base()
+        
+        # Officer lookups by state/UT name, alias or misspelling ("Mumbai", "tamilnadu", "J&K")
+        self.nodal_directory = NodalDirectory.from_knowledge_base()
+        
+        # Worker pool for running per-collection queries in parallel
+        self.executor = ThreadPoolExecutor(max_workers=int(os.getenv('SEARCH_WORKERS', '8')))
+        
+        # comprehensive_search / batch_search_sets results per corpus version (RETRIEVAL_CACHE_SIZE=0 disables)
+        self.retrieval_cache = RetrievalCache()
+        
+        # Per-endpoint adaptive-k cutoffs applied to comprehensive_search results (RETRIEVAL_POLICIES)
+        self.retrieval_policies = load_policies()
+    
+    @property
+    def client(self):
+        """The shared Weaviate client, or None when fully offline"""
+        return self.connection.client() if self.connection is not None else None
+    
+    def index_registry_version(self) -> str:
+        """corpus_version from the index pointer ("0" without a pointer)"""
+        pointer = self.index_registry.pointer() if self.index_registry is not None else None
+        if not pointer:
+            return "0"
+        return str(pointer.get("corpus_version", pointer.get("version", 0)))
+    
+    def corpus_version(self) -> str:
+        """Stamp of the corpus being searched; it changes whenever the knowledge base is re-ingested"""
+        # A local index is loaded once, so its results cannot go stale for the life of the process
+        if self.local_corpus_version is not None:
+            return self.local_corpus_version
+        return self.index_registry_version()
+    
+    def _build_bm25_index(self) -> BM25Index:
+        """BM25 over the objects the vector search returns, so fused ids always refer to the same object"""
+        if self.local_index is not None:
+            return BM25Index.from_objects({
+                name: (collection["ids"], collection["properties"]) for name, collection in self.local_index.collections.items()
+            })
+        return BM25Index.from_weaviate(
+            self.client,
+            {name: self.index_registry.collection_name(name) for name in self.COLLECTIONS.values()},
+            {name: self.return_properties[category] for category, name in self.COLLECTIONS.items()}
         )
     
-    def generate_query_embedding(self, query: str) -> List[float]:
-        """Generate embedding for the user query"""
+    def current_bm25_index(self) -> BM25Index:
+        """
+        The BM25 index for the current corpus version, rebuilt after an ingest or pointer swap.
+        Searches that arrive while another thread rebuilds keep using the previous index.
+        """
+        version = self.corpus_version()
+        if version != self.bm25_version and self.bm25_lock.acquire(blocking=False):
+            try:
+                if version != self.bm25_version:
+                    print(f"Corpus version changed ({self.bm25_version} -> {version}), rebuilding BM25 index")
+                    self.bm25_index = self._build_bm25_index()
+            except Exception as e:
+                print(f"Error rebuilding BM25 index, keeping the previous one: {e}")
+            finally:
+                # Also on failure, so a broken rebuild is not retried by every search
+                self.bm25_version = version
+                self.bm25_lock.release()
+        return self.bm25_index
+    
+    def _cached_results(self, key, start: float) -> Dict[str, Any]:
+        """Cached results for key with fresh timings, or None"""
+        results = self.retrieval_cache.get(key)
+        if results is not None:
+            elapsed = (time.perf_counter() - start) * 1000
+            results["timings"] = {"retrieval_cache": elapsed, "total": elapsed}
+        return results
+    
+    @staticmethod
+    def _complete(results: Dict[str, Any], limits: Dict[str, int]) -> bool:
+        """Whether every category returned something; an empty list means a failed embedding or query"""
+        return all(results.get(category) for category, limit in limits.items() if limit > 0)
+    
+    def _cache_results(self, key, results: Dict[str, Any], limits: Dict[str, int]):
+        """Cache results unless part of the search failed"""
+        if self._complete(results, limits):
+            self.retrieval_cache.put(key, results)
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Call the embedding API for a batch of queries (no caching)"""
+        if self.local_embedder is not None:
+            return self.local_embedder.embed(queries)
         try:
             result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=query,
+                model=self.embedding_model,
+                content=list(queries),
                 task_type="retrieval_query"
             )
             return result['embedding']
         except Exception as e:
-            print(f"Error generating query embedding: {e}")
+            print(f"Error generating query embeddings: {e}")
+            return [[] for _ in queries]
+    
+    def generate_query_embedding(self, query: str) -> List[float]:
+        """Generate embedding for the user query"""
+        return self.generate_query_embeddings([query])[0]
+    
+    def generate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Generate embeddings for several queries, batching every cache miss into a single request"""
+        if not queries:
             return []
+        return self.embedding_cache.get_or_embed(queries, self.embedding_model, "retrieval_query", self._embed_queries)
+    
+    def warm_embedding_cache(self, queries: List[str]):
+        """Embed any of the given queries that are not cached yet, in one batched request"""
+        before = self.embedding_cache.stats()
+        self.generate_query_embeddings(list(dict.fromkeys(queries)))
+        after = self.embedding_cache.stats()
+        print(f"Embedding cache warmed: {len(set(queries))} queries, {after['writes'] - before['writes']} newly embedded")
+    
+    def _format_result(self, category: str, properties: Dict[str, Any], object_id: str, distance: float) -> "SearchResult":
+        """Build the result dict for an object; unprojected fields are fetched by id on first access"""
+        lazy_fields = [name for name in self.RESULT_FIELDS[category] if name not in self.return_properties[category]]
+        result = {"id": object_id}
+        for name in self.return_properties[category]:
+            result[name] = properties.get(name, '')
+        result["distance"] = distance
+        return SearchResult(result, partial(self.fetch_property, category, object_id), lazy_fields)
+    
+    def fetch_property(self, category: str, object_id: str, name: str) -> Any:
+        """Fetch a single property of a stored object by id"""
+        if not object_id:
+            return ''
+        try:
+            if self.local_index is not None:
+                properties = self.local_index.get(self.COLLECTIONS[category], object_id)
+            else:
+                collection = self.client.collections.get(self.index_registry.collection_name(self.COLLECTIONS[category]))
+                item = collection.query.fetch_object_by_id(object_id, return_properties=[name])
+                properties = item.properties if item is not None else None
+            return (properties or {}).get(name, '')
+        except Exception as e:
+            print(f"Error fetching {name} for {object_id}: {e}")
+            return ''
+    
+    def _query_collection(self, category: str, query_vector: List[float], limit: int, query: str = None) -> List[Dict[str, Any]]:
+        """Query the collection backing a result category (hybrid when enabled and the query text is given)"""
+        if self.bm25_index is not None and query:
+            return self._hybrid_query(category, query, query_vector, limit)
+        return self._vector_query(category, query_vector, limit)
+    
+    def _vector_query(self, category: str, query_vector: List[float], limit: int) -> List[Dict[str, Any]]:
+        """Run a nearest-neighbour query against the collection backing a result category"""
+        if self.local_index is not None:
+            return self._local_query(category, query_vector, limit)
+        
+        collection = self.client.collections.get(self.index_registry.collection_name(self.COLLECTIONS[category]))
+        
+        response = collection.query.near_vector(
+            near_vector=query_vector,
+            limit=limit,
+            return_properties=self.return_properties[category],
+            return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
+        )
+        return self._format_response(category, response)
+    
+    def _local_query(self, category: str, query_vector: List[float], limit: int) -> List[Dict[str, Any]]:
+        return [
+            self._format_result(category, properties, object_id, distance)
+            for object_id, properties, distance in self.local_index.search(self.COLLECTIONS[category], query_vector, limit)
+        ]
+    
+    def _format_response(self, category: str, response) -> List[Dict[str, Any]]:
+        """Result dicts for a Weaviate query response"""
+        return [
+            self._format_result(
+                category,
+                item.properties,
+                str(item.uuid) if getattr(item, 'uuid', None) else '',
+                item.metadata.distance if item.metadata else None
+            )
+            for item in response.objects
+        ]
+    
+    def _hybrid_query(self, category: str, query: str, query_vector: List[float], limit: int) -> List[Dict[str, Any]]:
+        """
+        Fuse near_vector and BM25 candidates with weighted reciprocal rank fusion.
+        Results carry the fused "score"; BM25-only hits have distance None.
+        """
+        candidates = self._hybrid_candidates(category, limit)
+        vector_results = self._vector_query(category, query_vector, candidates)
+        return self._fuse(category, query, vector_results, candidates, limit, self.current_bm25_index())
+    
+    def _hybrid_candidates(self, category: str, limit: int) -> int:
+        """Results each retriever contributes before fusion"""
+        return max(limit, int(limit * self.hybrid_settings.get(category, {}).get("candidates", 2)))
+    
+    def _fuse(self, category: str, query: str, vector_results: List[Dict[str, Any]], candidates: int, limit: int,
+              bm25_index: BM25Index) -> List[Dict[str, Any]]:
+        """Weighted reciprocal rank fusion of vector results with BM25 hits for the query"""
+        settings = self.hybrid_settings.get(category, {})
+        bm25_hits = bm25_index.search(self.COLLECTIONS[category], query, candidates)
+        
+        fused = {}
+        for rank, result in enumerate(vector_results, start=1):
+            result["score"] = settings.get("vector_weight", 1.0) / (self.RRF_K + rank)
+            fused[result["id"]] = result
+        for rank, (object_id, properties, _) in enumerate(bm25_hits, start=1):
+            result = fused.get(object_id)
+            if result is None:
+                result = self._format_result(category, properties, object_id, None)
+                result["score"] = 0.0
+                fused[object_id] = result
+            result["score"] += settings.get("bm25_weight", 1.0) / (self.RRF_K + rank)
+        
+        return sorted(fused.values(), key=lambda r: r["score"], reverse=True)[:limit]
+    
+    def _timed_query(self, category: str, query_vector: List[float], limit: int, query: str = None):
+        """Run _query_collection and return (results, elapsed milliseconds)"""
+        start = time.perf_counter()
+        results = self._query_collection(category, query_vector, limit, query)
+        return results, (time.perf_counter() - start) * 1000
     
     def search_cyberlaw(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Search CyberLaw collection for relevant legal sections"""
@@ -42,28 +388,7 @@ class VectorSearcher:
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("CyberLaw")
-            
-            response = collection.query.near_vector(
-                near_vector=query_vector,
-                limit=limit,
-                return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
-            )
-            
-            results = []
-            for item in response.objects:
-                results.append({
-                    "section_number": item.properties.get('section_number', ''),
-                    "title": item.properties.get('title', ''),
-                    "content": item.properties.get('content', ''),
-                    "law_type": item.properties.get('law_type', ''),
-                    "summary": item.properties.get('summary', ''),
-                    "full_text": item.properties.get('full_text', ''),
-                    "source_file": item.properties.get('source_file', ''),
-                    "distance": item.metadata.distance if item.metadata else None
-                })
-            
-            return results
+            return self._query_collection("cyberlaw", query_vector, limit, query)
         except Exception as e:
             print(f"Error searching CyberLaw: {e}")
             return []
@@ -75,73 +400,328 @@ class VectorSearcher:
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("FAQ")
-            
-            response = collection.query.near_vector(
-                near_vector=query_vector,
-                limit=limit,
-                return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
-            )
-            
-            results = []
-            for item in response.objects:
-                results.append({
-                    "question": item.properties.get('question', ''),
-                    "answer": item.properties.get('answer', ''),
-                    "category": item.properties.get('category', ''),
-                    "source_file": item.properties.get('source_file', ''),
-                    "distance": item.metadata.distance if item.metadata else None
-                })
-            
-            return results
+            return self._query_collection("faq", query_vector, limit, query)
         except Exception as e:
             print(f"Error searching FAQ: {e}")
             return []
     
     def search_nodal_officers(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Search NodalOfficer collection for relevant contact information"""
+        officers = self.resolve_officers(query)
+        if officers:
+            return officers[:limit]
+        
         try:
             query_vector = self.generate_query_embedding(query)
             if not query_vector:
                 return []
             
-            collection = self.client.collections.get("NodalOfficer")
-            
-            response = collection.query.near_vector(
-                near_vector=query_vector,
-                limit=limit,
-                return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
-            )
-            
-            results = []
-            for item in response.objects:
-                results.append({
-                    "state": item.properties.get('state', ''),
-                    "officer_name": item.properties.get('officer_name', ''),
-                    "rank": item.properties.get('rank', ''),
-                    "email": item.properties.get('email', ''),
-                    "contact": item.properties.get('contact', ''),
-                    "source_file": item.properties.get('source_file', ''),
-                    "distance": item.metadata.distance if item.metadata else None
-                })
-            
-            return results
+            return self._query_collection("nodal_officers", query_vector, limit, query)
         except Exception as e:
             print(f"Error searching NodalOfficer: {e}")
             return []
     
-    def comprehensive_search(self, query: str) -> Dict[str, List[Dict[str, Any]]]:
-        """Search all collections and return comprehensive results"""
-        return {
-            "cyberlaw": self.search_cyberlaw(query, limit=15),  # Increased from 3 to 15
-            "faq": self.search_faq(query, limit=8),  # Increased from 2 to 8
-            "nodal_officers": self.search_nodal_officers(query, limit=8)
-        }
+    def multi_collection_search(self, query: str, limits: Dict[str, int], lexical_query: str = None) -> Dict[str, Any]:
+        """
+        Embed the query once and run the near_vector query for every category concurrently.
+        Returns one result list per category in `limits` plus a "timings" dict (milliseconds)
+        with the embedding time, each collection's query time and the total.
+        BM25 matches lexical_query when given (an empty one means vector search only).
+        """
+        lexical_query = query if lexical_query is None else lexical_query
+        start = time.perf_counter()
+        timings = {}
+        results = {category: [] for category in limits}
+        
+        query_vector = self.generate_query_embedding(query)
+        timings["embedding"] = (time.perf_counter() - start) * 1000
+        
+        if query_vector:
+            futures = {
+                category: self.executor.submit(self._timed_query, category, query_vector, limit, lexical_query)
+                for category, limit in limits.items()
+            }
+            for category, future in futures.items():
+                try:
+                    results[category], timings[category] = future.result()
+                except Exception as e:
+                    print(f"Error searching {self.COLLECTIONS[category]}: {e}")
+        
+        timings["total"] = (time.perf_counter() - start) * 1000
+        results["timings"] = timings
+        return results
+    
+    def resolve_sections(self, query: str) -> List[Dict[str, Any]]:
+        """CyberLaw results for sections the query names outright (distance 0, "exact_match": True)"""
+        results = []
+        for section in self.section_resolver.resolve(query):
+            result = self._format_result("cyberlaw", section["properties"], section["id"], 0.0)
+            result["exact_match"] = True
+            results.append(result)
+        return results
+    
+    def resolve_officers(self, query: str) -> List[Dict[str, Any]]:
+        """NodalOfficer results for states/UTs the query names (distance 0, "exact_match": True)"""
+        results = []
+        for officer in self.nodal_directory.search(query):
+            result = self._format_result("nodal_officers", officer["properties"], officer["id"], 0.0)
+            result["exact_match"] = True
+            results.append(result)
+        return results
+    
+    def apply_policy(self, results: Dict[str, Any], endpoint: str) -> Dict[str, Any]:
+        """Prune results with the endpoint's retrieval policy (unchanged for unknown endpoints)"""
+        policy = self.retrieval_policies.get(endpoint)
+        return policy.apply(results) if policy is not None else results
+    
+    def _direct_lookups(self, query: str, start: float):
+        """Named sections, officers for named locations, the limits left for vector search, and the time taken"""
+        exact_sections = self.resolve_sections(query)
+        officers = self.resolve_officers(query)
+        limits = dict(self.default_limits)
+        if officers:
+            # The directory already has the right officers, so NodalOfficer is not queried
+            limits.pop("nodal_officers", None)
+        return exact_sections, officers, limits, (time.perf_counter() - start) * 1000
+    
+    def comprehensive_search(self, query: str, endpoint: str = "chat", lexical_query: str = None) -> Dict[str, Any]:
+        """
+        Search all collections and return comprehensive results.
+        Sections named in the query come first; vector search fills the remaining cyberlaw slots.
+        When the query names a state/UT its officers come from the directory instead of vector search.
+        Section references, state names and BM25 are English/Latin-only; lexical_query stands in for the
+        query text in those steps (the direct pipeline passes the Latin keywords of a native-script query).
+        Full result lists are cached per corpus version (see retrieval_cache), then cut down by the
+        endpoint's retrieval policy.
+        """
+        start = time.perf_counter()
+        key = self.retrieval_cache.make_key("comprehensive", self._search_texts(query, lexical_query), self.default_limits, self.corpus_version())
+        cached = self._cached_results(key, start)
+        if cached is not None:
+            return self.apply_policy(cached, endpoint)
+        
+        exact_sections, officers, limits, resolve_time = self._direct_lookups(query if lexical_query is None else lexical_query, start)
+        results = self.multi_collection_search(query, limits, lexical_query)
+        results = self._pin_exact_sections(results, exact_sections, officers, resolve_time)
+        self._cache_results(key, results, self.default_limits)
+        return self.apply_policy(results, endpoint)
+    
+    @staticmethod
+    def _search_texts(query: str, lexical_query: str = None) -> List[str]:
+        """Retrieval cache key texts; a separate lexical query changes the results"""
+        return [query] if lexical_query is None else [query, lexical_query]
+    
+    def _pin_exact_sections(self, results: Dict[str, Any], exact_sections: List[Dict[str, Any]],
+                            officers: List[Dict[str, Any]], resolve_time: float) -> Dict[str, Any]:
+        """Put resolved sections first, let vector results fill the remaining cyberlaw slots, and add directory officers"""
+        if exact_sections:
+            exact_ids = {result["id"] for result in exact_sections}
+            remaining = [result for result in results.get("cyberlaw", []) if result["id"] not in exact_ids]
+            results["cyberlaw"] = (exact_sections + remaining)[:max(self.default_limits["cyberlaw"], len(exact_sections))]
+        if officers:
+            results["nodal_officers"] = officers
+        results["timings"]["direct_lookup"] = resolve_time
+        return results
+    
+    def batch_search_sets(self, queries: List[str], limits: Dict[str, int] = None) -> Dict[str, Any]:
+        """
+        Search all collections for several queries at once, keeping each query's results separate.
+        All queries are embedded in one batched request and every (query, collection) query runs
+        concurrently. Returns {"queries", "result_sets": [{category: results}] in query order, "timings"}.
+        """
+        limits = limits or self.default_limits
+        start = time.perf_counter()
+        timings = {}
+        
+        queries = list(dict.fromkeys(q for q in queries if q and q.strip()))
+        if not queries:
+            timings["total"] = 0.0
+            return {"queries": [], "result_sets": [], "timings": timings}
+        
+        key = self.retrieval_cache.make_key("batch", queries, limits, self.corpus_version())
+        cached = self._cached_results(key, start)
+        if cached is not None:
+            return cached
+        
+        query_vectors = self.generate_query_embeddings(queries)
+        timings["embedding"] = (time.perf_counter() - start) * 1000
+        
+        search_start = time.perf_counter()
+        result_sets = [{category: [] for category in limits} for _ in queries]
+        futures = []
+        for result_set, query, query_vector in zip(result_sets, queries, query_vectors):
+            if not query_vector:
+                continue
+            for category, limit in limits.items():
+                futures.append((result_set, category, self.executor.submit(self._query_collection, category, query_vector, limit, query)))
+        
+        for result_set, category, future in futures:
+            try:
+                result_set[category] = future.result()
+            except Exception as e:
+                print(f"Error searching {self.COLLECTIONS[category]}: {e}")
+        
+        timings["search"] = (time.perf_counter() - search_start) * 1000
+        timings["total"] = (time.perf_counter() - start) * 1000
+        batch = {"queries": queries, "result_sets": result_sets, "timings": timings}
+        if all(self._complete(result_set, limits) for result_set in result_sets):
+            self.retrieval_cache.put(key, batch)
+        return batch
+    
+    def batch_search(self, queries: List[str], limits: Dict[str, int] = None) -> Dict[str, Any]:
+        """
+        Search all collections for several queries at once and merge the results per category,
+        deduplicated by object id: smallest distance first, or rank-fused in hybrid mode.
+        """
+        limits = limits or self.default_limits
+        batch = self.batch_search_sets(queries, limits)
+        merger = ResultMerger("rrf" if self.bm25_index is not None else "min_distance")
+        
+        results = {category: [] for category in limits}
+        results.update(merger.merge(batch["result_sets"]))
+        results["timings"] = batch["timings"]
+        return results
+    
+    # Async variants: run on the shared background loop (async_runtime) so the async Weaviate
+    # and Gemini clients stay bound to one event loop
+    
+    async def _aembed_queries(self, queries: List[str]) -> List[List[float]]:
+        if self.local_embedder is not None:
+            return self.local_embedder.embed(queries)
+        try:
+            result = await genai.embed_content_async(
+                model=self.embedding_model,
+                content=list(queries),
+                task_type="retrieval_query"
+            )
+            return result['embedding']
+        except Exception as e:
+            print(f"Error generating query embeddings: {e}")
+            return [[] for _ in queries]
+    
+    async def agenerate_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        if not queries:
+            return []
+        return await self.embedding_cache.aget_or_embed(queries, self.embedding_model, "retrieval_query", self._aembed_queries)
+    
+    async def acorpus_version(self) -> str:
+        """corpus_version off the event loop (an expired pointer TTL means a sync Weaviate read)"""
+        return await asyncio.to_thread(self.corpus_version)
+    
+    async def _aquery_collection(self, category: str, query_vector: List[float], limit: int, query: str = None) -> List[Dict[str, Any]]:
+        hybrid = self.bm25_index is not None and query
+        candidates = self._hybrid_candidates(category, limit) if hybrid else limit
+        
+        if self.local_index is not None:
+            vector_results = self._local_query(category, query_vector, candidates)
+        else:
+            client = await self.connection.async_client()
+            # The pointer behind collection_name is re-read with the sync client when its TTL expires
+            physical_name = await asyncio.to_thread(self.index_registry.collection_name, self.COLLECTIONS[category])
+            collection = client.collections.get(physical_name)
+            response = await collection.query.near_vector(
+                near_vector=query_vector,
+                limit=candidates,
+                return_properties=self.return_properties[category],
+                return_metadata=weaviate.classes.query.MetadataQuery(distance=True)
+            )
+            vector_results = self._format_response(category, response)
+        
+        if hybrid:
+            # A corpus version change rebuilds the index, which must not block the event loop
+            bm25_index = await asyncio.to_thread(self.current_bm25_index)
+            return self._fuse(category, query, vector_results, candidates, limit, bm25_index)
+        return vector_results
+    
+    async def _atimed_query(self, category: str, query_vector: List[float], limit: int, query: str = None):
+        start = time.perf_counter()
+        results = await self._aquery_collection(category, query_vector, limit, query)
+        return results, (time.perf_counter() - start) * 1000
+    
+    async def amulti_collection_search(self, query: str, limits: Dict[str, int], lexical_query: str = None) -> Dict[str, Any]:
+        """Async multi_collection_search"""
+        lexical_query = query if lexical_query is None else lexical_query
+        start = time.perf_counter()
+        timings = {}
+        results = {category: [] for category in limits}
+        
+        query_vector = (await self.agenerate_query_embeddings([query]))[0]
+        timings["embedding"] = (time.perf_counter() - start) * 1000
+        
+        if query_vector:
+            categories = list(limits)
+            outcomes = await asyncio.gather(
+                *(self._atimed_query(category, query_vector, limits[category], lexical_query) for category in categories),
+                return_exceptions=True
+            )
+            for category, outcome in zip(categories, outcomes):
+                if isinstance(outcome, Exception):
+                    print(f"Error searching {self.COLLECTIONS[category]}: {outcome}")
+                else:
+                    results[category], timings[category] = outcome
+        
+        timings["total"] = (time.perf_counter() - start) * 1000
+        results["timings"] = timings
+        return results
+    
+    async def acomprehensive_search(self, query: str, endpoint: str = "chat", lexical_query: str = None) -> Dict[str, Any]:
+        """Async comprehensive_search"""
+        start = time.perf_counter()
+        key = self.retrieval_cache.make_key("comprehensive", self._search_texts(query, lexical_query), self.default_limits, await self.acorpus_version())
+        cached = self._cached_results(key, start)
+        if cached is not None:
+            return self.apply_policy(cached, endpoint)
+        
+        exact_sections, officers, limits, resolve_time = self._direct_lookups(query if lexical_query is None else lexical_query, start)
+        results = await self.amulti_collection_search(query, limits, lexical_query)
+        results = self._pin_exact_sections(results, exact_sections, officers, resolve_time)
+        self._cache_results(key, results, self.default_limits)
+        return self.apply_policy(results, endpoint)
+    
+    async def abatch_search_sets(self, queries: List[str], limits: Dict[str, int] = None) -> Dict[str, Any]:
+        """Async batch_search_sets"""
+        limits = limits or self.default_limits
+        start = time.perf_counter()
+        timings = {}
+        
+        queries = list(dict.fromkeys(q for q in queries if q and q.strip()))
+        if not queries:
+            timings["total"] = 0.0
+            return {"queries": [], "result_sets": [], "timings": timings}
+        
+        key = self.retrieval_cache.make_key("batch", queries, limits, await self.acorpus_version())
+        cached = self._cached_results(key, start)
+        if cached is not None:
+            return cached
+        
+        query_vectors = await self.agenerate_query_embeddings(queries)
+        timings["embedding"] = (time.perf_counter() - start) * 1000
+        
+        search_start = time.perf_counter()
+        result_sets = [{category: [] for category in limits} for _ in queries]
+        jobs = [
+            (result_set, category, self._aquery_collection(category, query_vector, limit, query))
+            for result_set, query, query_vector in zip(result_sets, queries, query_vectors) if query_vector
+            for category, limit in limits.items()
+        ]
+        outcomes = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+        for (result_set, category, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error searching {self.COLLECTIONS[category]}: {outcome}")
+            else:
+                result_set[category] = outcome
+        
+        timings["search"] = (time.perf_counter() - search_start) * 1000
+        timings["total"] = (time.perf_counter() - start) * 1000
+        batch = {"queries": queries, "result_sets": result_sets, "timings": timings}
+        if all(self._complete(result_set, limits) for result_set in result_sets):
+            self.retrieval_cache.put(key, batch)
+        return batch
     
     def close(self):
-        """Close the Weaviate client connection"""
-        if hasattr(self, 'client'):
-            self.client.close()
+        """Release this searcher's worker pool; the shared Weaviate client is closed at process exit"""
+        if hasattr(self, 'executor'):
+            self.executor.shutdown(wait=False)
 
 if __name__ == "__main__":
     # Test the vector searcher
@@ -151,19 +731,20 @@ if __name__ == "__main__":
     print(f"Testing search for: {test_query}")
     
     results = searcher.comprehensive_search(test_query)
+    print("Timings (ms): " + ", ".join(f"{stage}={elapsed:.1f}" for stage, elapsed in results['timings'].items()))
     
     print("\n=== CYBER LAW RESULTS ===")
     for result in results['cyberlaw']:
         print(f"Section {result['section_number']}: {result['title']} ({result['law_type']})")
         print(f"Summary: {result['summary'][:100]}...")
-        print(f"Distance: {result['distance']:.4f}")
+        print(f"Distance: {result['distance']:.4f}" if result['distance'] is not None else f"Score: {result['score']:.4f}")
         print("-" * 50)
     
     print("\n=== FAQ RESULTS ===")
     for result in results['faq']:
         print(f"Q: {result['question']}")
         print(f"A: {result['answer'][:100]}...")
-        print(f"Distance: {result['distance']:.4f}")
+        print(f"Distance: {result['distance']:.4f}" if result['distance'] is not None else f"Score: {result['score']:.4f}")
         print("-" * 50)
     
     print("\n=== NODAL OFFICERS ===")
@@ -171,7 +752,7 @@ if __name__ == "__main__":
         print(f"State: {result['state']}")
         print(f"Officer: {result['officer_name']} ({result['rank']})")
         print(f"Email: {result['email']}")
-        print(f"Distance: {result['distance']:.4f}")
+        print(f"Distance: {result['distance']:.4f}" if result['distance'] is not None else f"Score: {result['score']:.4f}")
         print("-" * 50)
     
     searcher.close()
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Embedding Snapshot Format
+Versioned on-disk copy of the embedded knowledge base so searchers can start without
+re-embedding or re-downloading the corpus.
+
+Layout of one snapshot (<root>/<version>/):
+- manifest.json              format version, embedding model, per-collection counts and dimensions
+- <Collection>.vectors.npy   (n, d) float32, L2-normalized rows, loaded with mmap_mode='r'
+- <Collection>.offsets.npy   (n, 2) int64 (start, end) byte offsets of each object in the blob
+- <Collection>.meta.npz      ids, section_number, law_type, title columns
+- <Collection>.blob          UTF-8 JSON of each object's properties, concatenated
+<root>/CURRENT names the active version and is replaced atomically on commit.
+While writing, vectors and offsets are appended to raw files and only converted to .npy on commit.
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+class SnapshotWriter:
+    def __init__(self, root: str, embedding_model: str, version: str = None):
+        self.root = root
+        self.embedding_model = embedding_model
+        self.version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+        self.final_path = os.path.join(root, self.version)
+        self.temp_path = os.path.join(root, f".tmp-{self.version}-{os.getpid()}")
+        os.makedirs(self.temp_path, exist_ok=True)
+        
+        # collection name -> {"vectors": file, "offsets": file, "count": int, "dimensions": int,
+        #                     "columns": {...}, "blob": file, "size": int}
+        # Vectors, offsets and properties are spilled to disk as they arrive so memory stays flat
+        self.collections = {}
+    
+    def _collection(self, name: str) -> Dict[str, Any]:
+        if name not in self.collections:
+            self.collections[name] = {
+                "vectors": open(os.path.join(self.temp_path, f"{name}.vectors.f32"), 'wb'),
+                "offsets": open(os.path.join(self.temp_path, f"{name}.offsets.i64"), 'wb'),
+                "count": 0,
+                "dimensions": 0,
+                "columns": {"ids": [], "section_number": [], "law_type": [], "title": []},
+                "blob": open(os.path.join(self.temp_path, f"{name}.blob"), 'wb'),
+                "size": 0
+            }
+        return self.collections[name]
+    
+    def add(self, collection_name: str, object_id: str, vector: List[float], properties: Dict[str, Any]):
+        """Append one embedded object to a collection"""
+        collection = self._collection(collection_name)
+        
+        row = np.asarray(vector, dtype=np.float32)
+        if collection["count"] == 0:
+            collection["dimensions"] = row.shape[0]
+        elif row.shape[0] != collection["dimensions"]:
+            raise ValueError(f"{collection_name}: expected {collection['dimensions']} dimensions, got {row.shape[0]}")
+        norm = np.linalg.norm(row)
+        collection["vectors"].write((row / norm if norm else row).tobytes())
+        collection["count"] += 1
+        
+        data = json.dumps(properties, ensure_ascii=False).encode('utf-8')
+        collection["blob"].write(data)
+        collection["offsets"].write(np.array([collection["size"], collection["size"] + len(data)], dtype=np.int64).tobytes())
+        collection["size"] += len(data)
+        
+        columns = collection["columns"]
+        columns["ids"].append(object_id)
+        columns["section_number"].append(str(properties.get('section_number', '')))
+        columns["law_type"].append(str(properties.get('law_type', '')))
+        columns["title"].append(str(properties.get('title', '')))
+    
+    def commit(self, keep: int = 3) -> str:
+        """Finalize the snapshot, point CURRENT at it and prune older versions"""
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "version": self.version,
+            "embedding_model": self.embedding_model,
+            "created": datetime.now().isoformat(),
+            "collections": {}
+        }
+        
+        for name, collection in self.collections.items():
+            self._close_files(collection)
+            shape = (collection["count"], collection["dimensions"])
+            self._raw_to_npy(name, "vectors.f32", "vectors.npy", np.float32, shape)
+            self._raw_to_npy(name, "offsets.i64", "offsets.npy", np.int64, (collection["count"], 2))
+            np.savez(
+                os.path.join(self.temp_path, f"{name}.meta.npz"),
+                **{column: np.asarray(values, dtype=str) for column, values in collection["columns"].items()}
+            )
+            manifest["collections"][name] = {
+                "count": collection["count"],
+                "dimensions": collection["dimensions"]
+            }
+        
+        with open(os.path.join(self.temp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        if os.path.exists(self.final_path):
+            shutil.rmtree(self.final_path)
+        os.replace(self.temp_path, self.final_path)
+        
+        pointer_temp = os.path.join(self.root, f".CURRENT-{os.getpid()}")
+        with open(pointer_temp, 'w', encoding='utf-8') as f:
+            f.write(self.version)
+        os.replace(pointer_temp, os.path.join(self.root, "CURRENT"))
+        
+        prune_snapshots(self.root, keep)
+        print(f"Snapshot {self.version} written to {self.final_path}")
+        return self.final_path
+    
+    @staticmethod
+    def _close_files(collection: Dict[str, Any]):
+        for key in ("vectors", "offsets", "blob"):
+            collection[key].close()
+    
+    def _raw_to_npy(self, name: str, raw_suffix: str, npy_suffix: str, dtype, shape, rows_per_copy: int = 65536):
+        """Convert a raw spill file into a .npy array, copying in slices rather than loading it whole"""
+        raw_path = os.path.join(self.temp_path, f"{name}.{raw_suffix}")
+        output = np.lib.format.open_memmap(os.path.join(self.temp_path, f"{name}.{npy_suffix}"), mode='w+', dtype=dtype, shape=shape)
+        if output.size:
+            raw = np.memmap(raw_path, dtype=dtype, mode='r', shape=shape)
+            for start in range(0, shape[0], rows_per_copy):
+                output[start:start + rows_per_copy] = raw[start:start + rows_per_copy]
+            del raw
+        output.flush()
+        del output
+        os.remove(raw_path)
+    
+    def abort(self):
+        """Discard a partially written snapshot"""
+        for collection in self.collections.values():
+            self._close_files(collection)
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+
+class SnapshotProperties:
+    """Sequence view that decodes an object's properties from the blob on access"""
+    
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+    
+    def __len__(self) -> int:
+        return self.offsets.shape[0]
+    
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        start, end = self.offsets[index]
+        return json.loads(self.blob[start:end].tobytes().decode('utf-8'))
+
+class VectorSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "manifest.json"), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.manifest.get('format_version')} in {path}")
+        
+        self.version = self.manifest["version"]
+        self.embedding_model = self.manifest["embedding_model"]
+    
+    def load_collection(self, name: str) -> Dict[str, Any]:
+        """Memory-map one collection: normalized matrix, ids, metadata columns and lazy properties"""
+        matrix = np.load(os.path.join(self.path, f"{name}.vectors.npy"), mmap_mode='r')
+        offsets = np.load(os.path.join(self.path, f"{name}.offsets.npy"), mmap_mode='r')
+        with np.load(os.path.join(self.path, f"{name}.meta.npz")) as meta:
+            columns = {column: meta[column] for column in meta.files}
+        
+        blob_path = os.path.join(self.path, f"{name}.blob")
+        if os.path.getsize(blob_path) > 0:
+            blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        else:
+            blob = np.zeros(0, dtype=np.uint8)
+        
+        return {
+            "matrix": matrix,
+            "ids": columns["ids"].tolist(),
+            "columns": columns,
+            "properties": SnapshotProperties(blob, offsets)
+        }
+    
+    @staticmethod
+    def current(root: str) -> Optional["VectorSnapshot"]:
+        """Open the snapshot CURRENT points at, or None if there is none"""
+        pointer = os.path.join(root, "CURRENT")
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+        path = os.path.join(root, version)
+        return VectorSnapshot(path) if os.path.isdir(path) else None
+
+def prune_snapshots(root: str, keep: int = 3):
+    """Delete all but the `keep` newest snapshot versions (never the CURRENT one)"""
+    current = None
+    pointer = os.path.join(root, "CURRENT")
+    if os.path.exists(pointer):
+        with open(pointer, 'r', encoding='utf-8') as f:
+            current = f.read().strip()
+    
+    versions = sorted(
+        entry for entry in os.listdir(root)
+        if not entry.startswith('.') and os.path.isdir(os.path.join(root, entry))
+    )
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
@@ -0,0 +1,130 @@
+"""
+Shared Weaviate Connection
+One process-wide Weaviate Cloud client for every module. The v4 client is thread-safe and
+multiplexes requests over a pooled HTTP session (WEAVIATE_POOL_CONNECTIONS / WEAVIATE_POOL_MAXSIZE)
+and a gRPC channel, so a single client serves the searcher, chatbots and ingestion alike.
+The client is health-checked every WEAVIATE_HEALTH_CHECK_INTERVAL seconds and reconnected when
+it stops responding; everything is closed at process exit.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+import weaviate
+from weaviate.config import AdditionalConfig, ConnectionConfig
+from dotenv import load_dotenv
+from async_runtime import get_background_loop
+
+load_dotenv()
+
+class WeaviateConnectionManager:
+    def __init__(self, url: str = None, api_key: str = None, health_check_interval: float = None):
+        self.url = url or os.getenv('WEAVIATE_URL')
+        self.api_key = api_key or os.getenv('WEAVIATE_API_KEY')
+        if not all([self.url, self.api_key]):
+            raise ValueError("Missing required environment variables: WEAVIATE_URL, WEAVIATE_API_KEY")
+        
+        self.health_check_interval = health_check_interval if health_check_interval is not None else float(os.getenv('WEAVIATE_HEALTH_CHECK_INTERVAL', '30'))
+        self.pool_connections = int(os.getenv('WEAVIATE_POOL_CONNECTIONS', '10'))
+        self.pool_maxsize = int(os.getenv('WEAVIATE_POOL_MAXSIZE', '50'))
+        
+        self.lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+        self.async_lock = asyncio.Lock()
+        self.checked_at = 0.0
+        self.stats = {"connects": 0, "reconnects": 0, "health_checks": 0}
+    
+    def _additional_config(self) -> AdditionalConfig:
+        return AdditionalConfig(
+            connection=ConnectionConfig(
+                session_pool_connections=self.pool_connections,
+                session_pool_maxsize=self.pool_maxsize
+            )
+        )
+    
+    def _connect(self):
+        client = weaviate.connect_to_weaviate_cloud(
+            cluster_url=self.url,
+            auth_credentials=weaviate.auth.AuthApiKey(self.api_key),
+            additional_config=self._additional_config()
+        )
+        self.stats["connects"] += 1
+        self.checked_at = time.monotonic()
+        return client
+    
+    def _healthy(self) -> bool:
+        self.stats["health_checks"] += 1
+        try:
+            return self._client.is_ready()
+        except Exception as e:
+            print(f"Weaviate health check failed: {e}")
+            return False
+    
+    def client(self):
+        """The shared client, connected on first use and reconnected if a health check fails"""
+        with self.lock:
+            if self._client is None:
+                self._client = self._connect()
+            elif time.monotonic() - self.checked_at > self.health_check_interval:
+                if self._healthy():
+                    self.checked_at = time.monotonic()
+                else:
+                    print("Reconnecting to Weaviate...")
+                    try:
+                        self._client.close()
+                    except Exception:
+                        pass
+                    self._client = self._connect()
+                    self.stats["reconnects"] += 1
+            return self._client
+    
+    async def async_client(self):
+        """Shared async client; must be awaited on the background loop (async_runtime) it is bound to"""
+        async with self.async_lock:
+            if self._async_client is None:
+                client = weaviate.use_async_with_weaviate_cloud(
+                    cluster_url=self.url,
+                    auth_credentials=weaviate.auth.AuthApiKey(self.api_key),
+                    additional_config=self._additional_config()
+                )
+                await client.connect()
+                self._async_client = client
+            return self._async_client
+    
+    def close(self):
+        """Close both clients; the next client() call reconnects"""
+        with self.lock:
+            if self._async_client is not None:
+                # The background loop may already be stopped at interpreter exit
+                loop = get_background_loop()
+                try:
+                    if loop.loop.is_running():
+                        loop.submit(self._async_client.close()).result(timeout=5)
+                except Exception as e:
+                    print(f"Error closing async Weaviate client: {e}")
+                self._async_client = None
+            if self._client is not None:
+                try:
+                    self._client.close()
+                except Exception as e:
+                    print(f"Error closing Weaviate client: {e}")
+                self._client = None
+
+_weaviate_manager = None
+_weaviate_manager_lock = threading.Lock()
+
+def get_weaviate_manager() -> WeaviateConnectionManager:
+    """Get or initialize the process-wide connection manager"""
+    global _weaviate_manager
+    with _weaviate_manager_lock:
+        if _weaviate_manager is None:
+            _weaviate_manager = WeaviateConnectionManager()
+            atexit.register(_weaviate_manager.close)
+        return _weaviate_manager
+
+def get_weaviate_client():
+    """Shortcut for get_weaviate_manager().client()"""
+    return get_weaviate_manager().client()